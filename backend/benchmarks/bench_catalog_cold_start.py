@@ -0,0 +1,60 @@
+# backend/benchmarks/bench_catalog_cold_start.py
+#
+# Cold-start cost of loading the pricing catalog: parsing the spreadsheets with pandas
+# (excel_handler.load_service_data) vs reading the compiled snapshot (catalog_compiler.load_catalog).
+# Each run is a fresh interpreter, so import time is included.
+# Run from the backend directory:  python benchmarks/bench_catalog_cold_start.py --runs 5
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import io, sys, json, time, contextlib, resource
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    from {module} import {function}
+    catalog = {function}()
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "rows": sum(len(c) for s in catalog[0].values() for c in s.values()),
+    "pandas_imported": "pandas" in sys.modules,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+PATHS = {
+    "excel (pandas)": ("excel_handler", "load_service_data"),
+    "snapshot": ("catalog_compiler", "load_catalog"),
+}
+
+def run_once(module, function):
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, function=function)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # Make sure the snapshot is current so the snapshot path measures the steady state.
+    run_once(*PATHS["snapshot"])
+
+    for name, (module, function) in PATHS.items():
+        results = [run_once(module, function) for _ in range(args.runs)]
+        times = [r["seconds"] * 1000 for r in results]
+        print(f"{name:>15}: median {statistics.median(times):7.1f} ms  min {min(times):7.1f} ms  "
+              f"rows {results[0]['rows']}  pandas imported: {results[0]['pandas_imported']}  "
+              f"max RSS {statistics.median(r['max_rss_mb'] for r in results):.0f} MB")
+
+if __name__ == "__main__":
+    main()
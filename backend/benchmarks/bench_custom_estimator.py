@@ -0,0 +1,47 @@
+# backend/benchmarks/bench_custom_estimator.py
+#
+# Custom ("Other Requirement") estimates: which catalog rows are picked as examples, the quote
+# each request gets, and what a cold estimate and a cache hit cost. Without GROQ_API_KEY every
+# estimate comes from the neighbouring rows, which is the floor the LLM answer is checked against.
+# Run from the backend directory:  python benchmarks/bench_custom_estimator.py
+
+import os
+import sys
+import time
+import asyncio
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_manager import catalog_manager
+
+REQUESTS = [
+    ("Food delivery app with live tracking", "App Development"),
+    ("Telemedicine app", "App Development"),
+    ("Online booking portal", "Web Development"),
+    ("Multi-vendor marketplace", "Web Development"),
+    ("Influencer campaign", "Digital Marketing Services"),
+    ("Local SEO for a dental clinic", "SEO Services"),
+    ("Invoice OCR and classification", "AI Development Services"),
+    ("Fleet management system", "Software Development Services"),
+    ("Something we have never built", None),
+]
+
+async def run():
+    estimator = catalog_manager.load().estimator
+    cold, warm, quotes = [], [], []
+    for name, main_service in REQUESTS:
+        start = time.perf_counter()
+        row = await estimator.estimate(name, main_service)
+        cold.append((time.perf_counter() - start) * 1000)
+        quotes.append(row['avg_cost_inr'])
+        start = time.perf_counter()
+        await estimator.estimate(name.upper(), main_service)
+        warm.append((time.perf_counter() - start) * 1e6)
+        print(f"{name!r:<42} INR {row['avg_cost_inr']:>10,}  [{row['estimate_source']}]  like {', '.join(row['estimate_examples'])}")
+    print(f"zero quotes: {sum(1 for q in quotes if q <= 0)}/{len(REQUESTS)}")
+    print(f"cold estimate: median {statistics.median(cold):.1f} ms   cache hit: median {statistics.median(warm):.0f} us")
+    print(f"stats: {estimator.stats()}")
+
+if __name__ == "__main__":
+    asyncio.run(run())
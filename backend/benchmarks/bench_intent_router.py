@@ -0,0 +1,66 @@
+# backend/benchmarks/bench_intent_router.py
+#
+# How much free-text chat input the local intent router resolves without the LLM, how often it
+# is right, and what it costs per message. Labels are (intent, slot); None means "should reach the LLM".
+# Run from the backend directory:  python benchmarks/bench_intent_router.py
+
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog_manager import catalog_manager
+
+LABELLED = [
+    ("show me pricing", ("pricing", None)),
+    ("how much does it cost?", ("pricing", None)),
+    ("quote please", ("pricing", None)),
+    ("pricng", ("pricing", None)),
+    ("I want an app", ("service", "App Development")),
+    ("need a food delivery app like swiggy", ("service", "App Development")),
+    ("grocery delivery", ("service", "App Development")),
+    ("how much is an android app?", ("service", "App Development")),
+    ("I need an ecommerce website", ("service", "Web Development")),
+    ("website for my bakery", ("service", "Web Development")),
+    ("seo", ("service", "SEO Services")),
+    ("improve our google ranking", ("service", "SEO Services")),
+    ("social media marketing", ("service", "Digital Marketing Services")),
+    ("a chatbot for customer support", ("service", "AI Development Services")),
+    ("custom crm software", ("service", "Software Development Services")),
+    ("go back", ("back", None)),
+    ("previous step", ("back", None)),
+    ("start over", ("restart", None)),
+    ("I'm looking for a job", ("careers", None)),
+    ("send my resume", ("careers", None)),
+    ("are you hiring", None),  # question form: the LLM answers it
+    ("talk to a human", ("contact", None)),
+    ("contact sales", ("contact", None)),
+    ("visit your website", ("website", None)),
+    ("what is your company's history?", None),
+    ("who founded infinite tech?", None),
+    ("where is your office located?", None),
+    ("what services do you offer?", None),
+    ("do you work with hospitals?", None),
+    ("tell me about your team", None),
+    ("hello", None),
+]
+
+def main():
+    router = catalog_manager.load().intents
+    correct, local, latencies = 0, 0, []
+    for text, expected in LABELLED:
+        start = time.perf_counter()
+        found = router.classify(text)
+        latencies.append((time.perf_counter() - start) * 1e6)
+        got = (found.name, found.slot) if found else None
+        local += got is not None
+        correct += got == expected
+        if got != expected:
+            print(f"MISS {text!r}: expected {expected}, got {found}")
+    print(f"accuracy: {correct}/{len(LABELLED)}   handled locally: {local}/{len(LABELLED)} (LLM calls avoided)")
+    print(f"classify latency: median {statistics.median(latencies):.0f} us, max {max(latencies):.0f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# backend/benchmarks/bench_knowledge_base.py
+#
+# Compares prompt size and latency of full-context vs retrieved-context general chat prompts.
+# Run from the backend directory:  python benchmarks/bench_knowledge_base.py --scale 20
+# With GROQ_API_KEY set, --live also measures real end-to-end LLM latency for both prompts.
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from knowledge_base import KnowledgeBase, KNOWLEDGE_FILE
+from llm_handler import build_general_messages
+from llm_client import complete
+
+QUERIES = [
+    "What services do you offer?",
+    "How is pricing decided?",
+    "Where are you located?",
+    "How can I contact HR about careers?",
+    "Do you build AI chatbots?",
+    "What is your mission?",
+]
+
+def approx_tokens(messages):
+    # ~4 characters per token is a good approximation for English prompts on Llama tokenizers.
+    return sum(len(m["content"]) for m in messages) // 4
+
+def scaled_copy(scale):
+    """Writes company_info.txt repeated `scale` times to simulate marketing adding content."""
+    with open(KNOWLEDGE_FILE, "r", encoding="utf-8") as f:
+        text = f.read()
+    tmp = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8")
+    tmp.write("\n\n".join(text for _ in range(scale)))
+    tmp.close()
+    return tmp.name
+
+async def live_latency(messages_list):
+    start = time.perf_counter()
+    for messages in messages_list:
+        await complete(messages=messages, temperature=0.2)
+    return (time.perf_counter() - start) / len(messages_list)
+
+def main(scale, iterations, live):
+    path = scaled_copy(scale) if scale > 1 else KNOWLEDGE_FILE
+    kb = KnowledgeBase(path)
+    kb.load()
+
+    # Full-context path: read the file and build the prompt on every request (old behaviour).
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for q in QUERIES:
+            with open(path, "r", encoding="utf-8") as f:
+                build_general_messages(q, f.read())
+    full_prep = (time.perf_counter() - start) / (iterations * len(QUERIES))
+
+    # Retrieval path: top-k chunks from the in-memory index.
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for q in QUERIES:
+            build_general_messages(q, "\n\n".join(kb.retrieve(q)))
+    rag_prep = (time.perf_counter() - start) / (iterations * len(QUERIES))
+
+    full_all = [build_general_messages(q, kb.full_text()) for q in QUERIES]
+    rag_all = [build_general_messages(q, "\n\n".join(kb.retrieve(q))) for q in QUERIES]
+    full_tokens = sum(approx_tokens(m) for m in full_all) / len(QUERIES)
+    rag_tokens = sum(approx_tokens(m) for m in rag_all) / len(QUERIES)
+
+    print(f"Knowledge file scale: x{scale}")
+    print(f"{'':22}{'full context':>15}{'retrieval':>15}")
+    print(f"{'avg prompt tokens':22}{full_tokens:>15.0f}{rag_tokens:>15.0f}")
+    print(f"{'avg prep latency (ms)':22}{full_prep * 1000:>15.3f}{rag_prep * 1000:>15.3f}")
+
+    if live:
+        full_llm = asyncio.run(live_latency(full_all))
+        rag_llm = asyncio.run(live_latency(rag_all))
+        print(f"{'avg LLM latency (s)':22}{full_llm:>15.2f}{rag_llm:>15.2f}")
+
+    if path != KNOWLEDGE_FILE:
+        os.remove(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark full-context vs retrieved-context prompts.")
+    parser.add_argument("--scale", type=int, default=1, help="Repeat company_info.txt N times to simulate growth.")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--live", action="store_true", help="Also call the real LLM (needs GROQ_API_KEY).")
+    args = parser.parse_args()
+    main(args.scale, args.iterations, args.live)
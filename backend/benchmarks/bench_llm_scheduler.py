@@ -0,0 +1,58 @@
+# backend/benchmarks/bench_llm_scheduler.py
+#
+# A burst of background proposal calls followed by live chat calls, against a fake LLM with a fixed
+# latency: how long chat waits for a slot with priority classes and the interactive reserve, compared
+# with one shared first-come-first-served queue of the same size.
+# Run from the backend directory:  python benchmarks/bench_llm_scheduler.py --background 60 --chat 20
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_scheduler import LLMScheduler, INTERACTIVE, BACKGROUND
+
+async def run(scheduler, background, chat, latency, chat_priority):
+    waits = []
+
+    async def call(priority, record):
+        start = time.perf_counter()
+        async with scheduler.slot(priority, 500):
+            if record:
+                waits.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(latency)
+
+    jobs = [asyncio.create_task(call(BACKGROUND, False)) for _ in range(background)]
+    await asyncio.sleep(latency / 10)  # chat arrives while the burst is queued
+    chats = []
+    for _ in range(chat):
+        chats.append(asyncio.create_task(call(chat_priority, True)))
+        await asyncio.sleep(latency / 5)
+    await asyncio.gather(*jobs, *chats)
+    return waits
+
+def report(label, waits):
+    print(f"{label:<34} chat wait: median {statistics.median(waits):7.1f} ms   max {max(waits):7.1f} ms")
+
+async def main(args):
+    def scheduler(reserved):
+        return LLMScheduler(max_in_flight=args.max_in_flight, reserved=reserved, requests_per_minute=args.rpm, tokens_per_minute=0)
+    report("one FIFO queue", await run(scheduler(0), args.background, args.chat, args.latency, BACKGROUND))
+    prioritised = scheduler(args.reserved)
+    report("priority classes + reserve", await run(prioritised, args.background, args.chat, args.latency, INTERACTIVE))
+    print(f"stats: {prioritised.stats()['priorities']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chat latency behind a burst of background LLM calls.")
+    parser.add_argument("--background", type=int, default=60)
+    parser.add_argument("--chat", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--reserved", type=int, default=2)
+    parser.add_argument("--rpm", type=float, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args))
@@ -0,0 +1,67 @@
+# backend/benchmarks/bench_pdf_writer.py
+#
+# Micro-benchmark for proposal PDF rendering: PDFs per second and peak memory,
+# with per-document font parsing (old behaviour) vs the process-wide font cache.
+# Run from the backend directory:  python benchmarks/bench_pdf_writer.py --count 30
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_writer
+from country_data import countries
+from proposal_logic import prepare_proposal_data
+
+USER_DETAILS = {
+    "name": "Jane Doe", "company": "Acme Corp", "email": "jane@acme.com", "phone": "5550100",
+    "contact": "5550100", "country": "USA", "company_size": "11-50", "budget": "$1,200 - $4,800",
+    "main_service": "Web Development", "sub_category": "_default", "category": "E-commerce Website",
+    "description": "Payment gateway and inventory sync.",
+}
+PROPOSAL_TEXT = {"introduction": "We are delighted to present this proposal for your new e-commerce platform. " * 6}
+CATEGORY_DATA = {"ui_ux_cost_inr": 50000, "frontend_cost_inr": 90000, "backend_cost_inr": 120000, "qa_cost_inr": 30000, "pm_cost_inr": 25000, "optional_addons_cost_inr": 15000}
+
+def legacy_setup_fonts(pdf_instance):
+    font_path = os.path.join(os.path.dirname(pdf_writer.__file__), "fonts")
+    pdf_instance.add_font("DejaVu", "", os.path.join(font_path, "DejaVuSans.ttf"))
+    pdf_instance.add_font("DejaVu", "B", os.path.join(font_path, "DejaVuSans-Bold.ttf"))
+    pdf_instance.add_font("DejaVu", "I", os.path.join(font_path, "DejaVuSans-Oblique.ttf"))
+
+def render(label, count, out_dir, costs, country_info):
+    for i in range(count):
+        pdf_writer.create_proposal_pdf(USER_DETAILS, PROPOSAL_TEXT, costs, country_info, os.path.join(out_dir, f"{label}_{i}_client.pdf"))
+        pdf_writer.create_sales_lead_pdf(USER_DETAILS, costs, os.path.join(out_dir, f"{label}_{i}_sales.pdf"))
+
+def run(label, setup, count, out_dir):
+    pdf_writer.setup_fonts = setup
+    country_info = countries["USA"]
+    costs = prepare_proposal_data(CATEGORY_DATA, country_info, USER_DETAILS["company_size"])
+    render(label, 1, out_dir, costs, country_info)  # warm-up (fills the font cache for "after")
+
+    # Throughput and memory are measured in separate passes: tracemalloc slows rendering a lot.
+    start = time.perf_counter()
+    render(label, count, out_dir, costs, country_info)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    render(label, 1, out_dir, costs, country_info)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = os.path.getsize(os.path.join(out_dir, f"{label}_0_client.pdf"))
+    print(f"{label:8} {2 * count / elapsed:10.1f} PDFs/s {peak / 1024 / 1024:10.1f} MB peak/proposal {size / 1024:8.1f} KB/client PDF")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark proposal PDF rendering.")
+    parser.add_argument("--count", type=int, default=20, help="Number of proposals (client + sales PDF each).")
+    args = parser.parse_args()
+
+    cached_setup = pdf_writer.setup_fonts
+    with tempfile.TemporaryDirectory() as out_dir:
+        run("before", legacy_setup_fonts, args.count, out_dir)
+        run("after", cached_setup, args.count, out_dir)
@@ -0,0 +1,57 @@
+# backend/benchmarks/bench_price_matrix.py
+#
+# Checks that the precomputed price matrix matches prepare_proposal_data() byte for byte on every
+# catalog row x country x company size, then compares per-quote latency.
+# Run from the backend directory:  python benchmarks/bench_price_matrix.py --count 20000
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from country_data import countries
+from catalog_manager import catalog_manager
+from proposal_logic import prepare_proposal_data
+
+COMPANY_SIZES = ["1-10", "11-50", "51-200", "200+", "0-10", "10-100", "100-500", "500+", ""]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000)
+    args = parser.parse_args()
+
+    catalog = catalog_manager.load()
+    start = time.perf_counter()
+    prices = catalog.prices
+    print(f"build: {(time.perf_counter() - start) * 1000:.1f} ms for {prices.stats()}")
+
+    checked = 0
+    for main_service, sub_categories in catalog.services_data.items():
+        for sub_category, categories in sub_categories.items():
+            for category, category_data in categories.items():
+                for country, country_info in countries.items():
+                    for company_size in COMPANY_SIZES:
+                        expected = json.dumps(prepare_proposal_data(category_data, country_info, company_size), ensure_ascii=False)
+                        actual = json.dumps(prices.quote(main_service, sub_category, category, country, company_size), ensure_ascii=False)
+                        if actual != expected:
+                            sys.exit(f"MISMATCH {main_service}/{sub_category}/{category} {country} {company_size!r}:\n  {expected}\n  {actual}")
+                        checked += 1
+    print(f"identical: {checked} quotes")
+
+    main_service, sub_category, category = "Web Development", "_default", next(iter(catalog.services_data["Web Development"]["_default"]))
+    category_data = catalog.services_data[main_service][sub_category][category]
+    start = time.perf_counter()
+    for _ in range(args.count):
+        prepare_proposal_data(category_data, countries["USA"], "11-50")
+    scalar = (time.perf_counter() - start) / args.count * 1e6
+    start = time.perf_counter()
+    for _ in range(args.count):
+        prices.quote(main_service, sub_category, category, "USA", "11-50")
+    lookup = (time.perf_counter() - start) / args.count * 1e6
+    print(f"prepare_proposal_data: {scalar:.2f} us/quote   price matrix: {lookup:.2f} us/quote")
+
+if __name__ == "__main__":
+    main()
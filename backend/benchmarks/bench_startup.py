@@ -0,0 +1,68 @@
+# backend/benchmarks/bench_startup.py
+#
+# Cold-start regression check: time from launching uvicorn to the first 200 from `/`, plus the
+# app's own startup report (per import/init phase). Exits non-zero when the median exceeds
+# --budget-ms, so it can run in CI.
+# Run from the backend directory:  python benchmarks/bench_startup.py --runs 3 --budget-ms 2000
+
+import os
+import sys
+import time
+import socket
+import argparse
+import statistics
+import subprocess
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def time_to_first_response(timeout=60):
+    port = free_port()
+    env = dict(os.environ, PROPOSAL_WORKERS="0", PROPOSAL_WARMUP="0", CATALOG_WATCH="0", PYTHONUNBUFFERED="1")
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        elapsed = (time.perf_counter() - start) * 1000
+                        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as m:
+                            import json
+                            startup = json.loads(m.read())["startup"]
+                        return elapsed, startup
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError("server did not answer in time")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    results = [time_to_first_response() for _ in range(args.runs)]
+    times = [elapsed for elapsed, _ in results]
+    startup = results[-1][1]
+    print(f"launch -> first `/` 200: median {statistics.median(times):.0f} ms (runs: {', '.join(f'{t:.0f}' for t in times)})")
+    print(f"app-reported ready after {startup['ready_ms']} ms; heavy modules at ready: {', '.join(startup['heavy_modules_at_ready']) or 'none'}")
+    for p in startup["phases"]:
+        print(f"    {p['phase']:<28} start {p['start_ms']:>8.1f} ms   took {p['duration_ms']:>8.1f} ms")
+
+    if args.budget_ms is not None and statistics.median(times) > args.budget_ms:
+        print(f"FAIL: median startup exceeds the {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# backend/benchmarks/fake_mailjet.py
+#
+# Local stand-in for Mailjet's POST /v3.1/send, for exercising email_client without real sends.
+# Run from the backend directory:  python benchmarks/fake_mailjet.py --port 8025 --fail-rate 0.2
+# then start the app with MAILJET_API_URL=http://127.0.0.1:8025/v3.1/send
+
+import json
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeMailjetHandler(BaseHTTPRequestHandler):
+    fail_rate = 0.0
+    calls = 0
+    messages = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        batch = body.get("Messages", [])
+        with self.lock:
+            FakeMailjetHandler.calls += 1
+            FakeMailjetHandler.messages += len(batch)
+        print(f"POST {self.path}: {len(batch)} message(s) (total: {self.calls} calls, {self.messages} messages)")
+
+        if random.random() < self.fail_rate:
+            self._reply(503, {"ErrorMessage": "Service temporarily unavailable"})
+            return
+        self._reply(200, {"Messages": [
+            {"Status": "success", "To": [{"Email": m["To"][0]["Email"], "MessageID": random.randint(1, 10**12)}]}
+            for m in batch
+        ]})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def serve(port=8025, fail_rate=0.0):
+    FakeMailjetHandler.fail_rate = fail_rate
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeMailjetHandler)
+    print(f"Fake Mailjet listening on http://127.0.0.1:{server.server_port}/v3.1/send (fail rate {fail_rate:.0%})")
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    serve(args.port, args.fail_rate).serve_forever()
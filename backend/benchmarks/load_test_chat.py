@@ -0,0 +1,74 @@
+# backend/benchmarks/load_test_chat.py
+#
+# Load test for /chat general_chat fallback with a slow fake LLM.
+# Run from the backend directory:  python benchmarks/load_test_chat.py --requests 200 --latency 0.5
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import llm_client
+from main import app
+
+class FakeCompletions:
+    """Mimics AsyncGroq.chat.completions with a fixed response delay."""
+    def __init__(self, latency):
+        self.latency = latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def create(self, **kwargs):
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        message = SimpleNamespace(content="We offer App, Web, AI, Software, SEO and Digital Marketing services.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+class FakeLLM:
+    def __init__(self, latency):
+        self.chat = SimpleNamespace(completions=FakeCompletions(latency))
+
+    async def close(self):
+        pass
+
+async def run(total_requests, concurrency, latency):
+    fake = FakeLLM(latency)
+    llm_client.set_client(fake)
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        async def one(i):
+            async with semaphore:
+                payload = {"stage": "general_chat", "user_details": {"stage_history": []}, "user_input": f"What services do you offer? #{i}"}
+                response = await client.post("/chat", json=payload)
+                response.raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total_requests)))
+        elapsed = time.perf_counter() - start
+
+    serial_estimate = total_requests * latency
+    print(f"Requests:            {total_requests}")
+    print(f"Concurrency:         {concurrency}")
+    print(f"Fake LLM latency:    {latency:.2f}s")
+    print(f"Peak LLM in flight:  {fake.chat.completions.peak_in_flight}")
+    print(f"Wall time:           {elapsed:.2f}s (a blocking client would need ~{serial_estimate:.1f}s)")
+    print(f"Throughput:          {total_requests / elapsed:.1f} req/s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure /chat throughput with slow fake LLM responses in flight.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.latency))
@@ -0,0 +1,86 @@
+# backend/catalog_compiler.py
+#
+# Compiles the pricing spreadsheets into catalog_snapshot.json so processes can start without
+# pandas/openpyxl. The snapshot records a sha256 per spreadsheet and is recompiled only when one
+# of them changes. Rebuild by hand with:  python catalog_compiler.py
+
+import os
+import json
+import hashlib
+from excel_handler import SERVICE_FILES, load_service_data
+
+CATALOG_SNAPSHOT_FILE = os.getenv("CATALOG_SNAPSHOT_FILE", os.path.join(os.path.dirname(__file__), "catalog_snapshot.json"))
+SNAPSHOT_FORMAT = 1
+
+def file_hashes():
+    """sha256 of every configured spreadsheet (None when a file is missing)."""
+    hashes = {}
+    for main_service, file_path in SERVICE_FILES.items():
+        try:
+            with open(file_path, "rb") as f:
+                hashes[main_service] = hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            hashes[main_service] = None
+    return hashes
+
+def _to_builtin(value):
+    # numpy scalars that survive to_dict('records')
+    return value.item() if hasattr(value, "item") else str(value)
+
+def compile_catalog(path: str = CATALOG_SNAPSHOT_FILE, hashes=None):
+    """Parses the spreadsheets (pandas) and writes the snapshot. Returns the 4-tuple load_service_data() returns."""
+    hashes = hashes or file_hashes()
+    services_data, main_services, sub_categories_others, app_sub_category_definitions = load_service_data()
+    if not services_data:
+        return None, None, None, None
+
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "hashes": hashes,
+        "services_data": services_data,
+        "main_services": main_services,
+        "sub_categories_others": sub_categories_others,
+        "app_sub_category_definitions": app_sub_category_definitions,
+    }
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"), default=_to_builtin)
+        os.replace(tmp_path, path)
+        print(f"Compiled catalog snapshot '{path}'.")
+    except Exception as e:
+        print(f"WARNING: Could not write catalog snapshot '{path}'. Error: {e}")
+    # Return what a later load_catalog() will see: plain dicts, no defaultdicts.
+    return json.loads(json.dumps([services_data, main_services, sub_categories_others, app_sub_category_definitions], default=_to_builtin))
+
+def read_snapshot(path: str = CATALOG_SNAPSHOT_FILE):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        return snapshot if snapshot.get("format") == SNAPSHOT_FORMAT else None
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"WARNING: Could not read catalog snapshot '{path}'. Error: {e}")
+        return None
+
+def load_catalog(path: str = CATALOG_SNAPSHOT_FILE):
+    """
+    Drop-in replacement for load_service_data(): serves the snapshot when its hashes match the
+    spreadsheets, and only falls back to compiling them (importing pandas) when they don't.
+    """
+    hashes = file_hashes()
+    snapshot = read_snapshot(path)
+    if snapshot is not None and snapshot["hashes"] == hashes:
+        print(f"Loaded catalog snapshot for services: {snapshot['main_services']}")
+        return snapshot["services_data"], snapshot["main_services"], snapshot["sub_categories_others"], snapshot["app_sub_category_definitions"]
+
+    print("Catalog snapshot is missing or stale, compiling the spreadsheets...")
+    compiled = compile_catalog(path, hashes)
+    if compiled[0] is None and snapshot is not None:
+        print("WARNING: Compiling failed, serving the stale catalog snapshot.")
+        return snapshot["services_data"], snapshot["main_services"], snapshot["sub_categories_others"], snapshot["app_sub_category_definitions"]
+    return tuple(compiled)
+
+if __name__ == "__main__":
+    compile_catalog()
@@ -0,0 +1,156 @@
+# backend/catalog_manager.py
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from functools import cached_property
+from collections import OrderedDict
+
+from country_data import countries
+from option_registry import OptionRegistry
+from price_matrix import PriceMatrix
+from intent_router import IntentRouter
+from catalog_search import CatalogSearchIndex
+from excel_handler import SERVICE_FILES
+from catalog_compiler import file_hashes, load_catalog
+
+CATALOG_WATCH_SECONDS = float(os.getenv("CATALOG_WATCH_SECONDS", "5"))
+# Older versions stay available so conversations started on them can finish on them.
+CATALOG_KEEP_VERSIONS = int(os.getenv("CATALOG_KEEP_VERSIONS", "3"))
+
+
+class Catalog:
+    """One immutable version of the service catalog, plus its precomputed option lists."""
+    def __init__(self, services_data, main_services, sub_categories_others, app_sub_category_definitions, version="unversioned"):
+        self.services_data = services_data
+        self.main_services = main_services
+        self.sub_categories_others = sub_categories_others
+        self.app_sub_category_definitions = app_sub_category_definitions
+        self.version = version
+        self.loaded_at = time.time()
+        self.options = OptionRegistry(self, countries)
+        self.intents = IntentRouter(self)
+        self.search_index = CatalogSearchIndex(self)
+
+    @cached_property
+    def prices(self) -> PriceMatrix:
+        """Built on first use (it needs NumPy): proposal workers warm it, the web process may never."""
+        return PriceMatrix(self, countries)
+
+    @cached_property
+    def estimator(self):
+        """Custom-requirement cost estimator; only proposal workers use it, so it is built on first use."""
+        from custom_estimator import CustomEstimator  # imports the LLM stack
+        return CustomEstimator(self)
+
+
+def catalog_version(hashes):
+    """Content-derived, so every process that loads the same spreadsheets agrees on it."""
+    return hashlib.sha256(json.dumps(hashes, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+def _mtimes():
+    mtimes = {}
+    for file_path in SERVICE_FILES.values():
+        try: mtimes[file_path] = os.path.getmtime(file_path)
+        except OSError: mtimes[file_path] = None
+    return mtimes
+
+
+class CatalogManager:
+    """
+    Holds the current Catalog and reloads it without downtime: a new version is built off the
+    request path (in a worker thread) and swapped in with a single assignment. Readers grab
+    `current` (or `resolve(version)`) once per request and use that object throughout.
+    """
+    def __init__(self):
+        self._versions = OrderedDict()
+        self._current = None
+        self._mtimes = None
+        self._reload_lock = threading.Lock()
+        self._listeners = []
+        self.reloads = 0
+
+    @property
+    def current(self) -> Catalog:
+        return self._current
+
+    def load(self):
+        """
+        Synchronous first load; returns the live Catalog (the current one if the spreadsheets are
+        unchanged), or None if no service data could be loaded.
+        """
+        catalog = self._build()
+        if catalog is not None:
+            self._install(catalog)
+        return self._current
+
+    def _build(self):
+        mtimes = _mtimes()
+        version = catalog_version(file_hashes())
+        if self._current is not None and version == self._current.version:
+            self._mtimes = mtimes
+            return None
+        # Recorded before loading, so a broken spreadsheet is retried on its next change, not every poll.
+        self._mtimes = mtimes
+        services_data, main_services, sub_categories_others, app_sub_category_definitions = load_catalog()
+        if not services_data:
+            return None
+        return Catalog(services_data, main_services, sub_categories_others, app_sub_category_definitions, version)
+
+    def _install(self, catalog):
+        self._versions[catalog.version] = catalog
+        self._versions.move_to_end(catalog.version)
+        while len(self._versions) > CATALOG_KEEP_VERSIONS:
+            self._versions.popitem(last=False)
+        self._current = catalog
+        print(f"Catalog version {catalog.version} is live.")
+
+    def resolve(self, version=None) -> Catalog:
+        """The catalog a conversation pinned to `version` should use (current if unknown or evicted)."""
+        return self._versions.get(version, self._current) if version else self._current
+
+    def add_listener(self, callback):
+        """callback(catalog) runs on the event loop after each successful reload."""
+        self._listeners.append(callback)
+
+    async def reload(self):
+        """Rebuilds the catalog if the spreadsheets changed. Returns True if a new version went live."""
+        def build():
+            with self._reload_lock:
+                return self._build()
+
+        catalog = await asyncio.to_thread(build)
+        if catalog is None:
+            return False
+        self._install(catalog)
+        self.reloads += 1
+        for callback in self._listeners:
+            callback(catalog)
+        return True
+
+    def changed_on_disk(self):
+        return _mtimes() != self._mtimes
+
+    async def watch(self, interval: float = CATALOG_WATCH_SECONDS):
+        """Polls the spreadsheets' mtimes and reloads when one changes. Runs until cancelled."""
+        while True:
+            await asyncio.sleep(interval)
+            if self.changed_on_disk():
+                try:
+                    await self.reload()
+                except Exception as e:
+                    print(f"WARNING: Catalog reload failed, keeping version {self._current.version}. Error: {e}")
+
+    def stats(self):
+        return {
+            "version": self._current.version if self._current else None,
+            "loaded_at": self._current.loaded_at if self._current else None,
+            "versions_kept": list(self._versions),
+            "reloads": self.reloads,
+        }
+
+
+catalog_manager = CatalogManager()
@@ -0,0 +1,111 @@
+# backend/catalog_search.py
+
+import os
+import re
+import math
+from collections import defaultdict
+
+CATALOG_MATCH_MIN_SCORE = float(os.getenv("CATALOG_MATCH_MIN_SCORE", "0.4"))
+CATALOG_MATCH_MIN_MARGIN = float(os.getenv("CATALOG_MATCH_MIN_MARGIN", "0.05"))
+# Share of the query's words the matched row has to contain ("online store" vs "Online Pharmacy": 0.5).
+CATALOG_MATCH_MIN_COVERAGE = float(os.getenv("CATALOG_MATCH_MIN_COVERAGE", "0.6"))
+
+# How much a query trigram found in each column counts. The category name dominates.
+FIELD_WEIGHTS = {"category": 1.0, "sub_category": 0.7, "project_overview": 0.5, "core_modules": 0.5}
+# Share of a word's trigrams (idf-weighted) a row needs for the word to count as found in it.
+WORD_MATCH_SHARE = 0.6
+SEARCH_STOPWORDS = {"a", "an", "and", "for", "i", "in", "me", "my", "need", "of", "on", "our", "please", "the", "to", "want", "we", "with"}
+
+def normalize(text):
+    # "E-commerce" and "eCommerce" should meet: drop hyphens, lower-case, split on the rest.
+    return re.findall(r"[a-z0-9]+", str(text).lower().replace("-", ""))
+
+def trigrams(words):
+    grams = set()
+    for word in words:
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class CatalogSearchIndex:
+    """
+    Fuzzy search over one catalog version's rows. Each row is indexed by the character trigrams
+    of its category, sub_category, project_overview and core_modules columns, so prefixes
+    ("ecom") and typos ("ecomerce") still share most trigrams with the row they mean.
+    A row's score is the idf-weighted share of the query's trigrams it contains (0..1), each
+    counted at the weight of the best column it appears in.
+    """
+    def __init__(self, catalog):
+        self.rows = []
+        postings = defaultdict(dict)  # trigram -> {row index: best field weight}
+        for main_service, sub_categories in catalog.services_data.items():
+            for sub_category, categories in sub_categories.items():
+                for category, category_data in categories.items():
+                    i = len(self.rows)
+                    self.rows.append((main_service, sub_category, category))
+                    fields = {
+                        "category": category,
+                        "sub_category": "" if sub_category == "_default" else sub_category,
+                        "project_overview": category_data.get("project_overview") or "",
+                        "core_modules": category_data.get("core_modules") or "",
+                    }
+                    for field, text in fields.items():
+                        for gram in trigrams(normalize(text)):
+                            postings[gram][i] = max(FIELD_WEIGHTS[field], postings[gram].get(i, 0.0))
+
+        n = len(self.rows)
+        self._postings = dict(postings)
+        self._idf = {gram: math.log((1 + n) / (1 + len(rows))) + 1 for gram, rows in postings.items()}
+        self._unknown_idf = math.log(1 + n) + 1
+
+    def search(self, query, main_service=None, sub_category=None, limit=5):
+        """
+        Best rows for `query`, optionally within one main service / sub-category, best first.
+        `coverage` is the share of the query's words the row contains at all (a word counts once
+        most of its trigrams are there), so "online store" doesn't match "Online Pharmacy" well.
+        """
+        words = [w for w in dict.fromkeys(normalize(query)) if w not in SEARCH_STOPWORDS]
+        if not words:
+            return []
+        scores = defaultdict(float)
+        covered = defaultdict(int)
+        total = 0.0
+        for word in words:
+            grams = trigrams([word])
+            word_total = sum(self._idf.get(gram, self._unknown_idf) for gram in grams)
+            total += word_total
+            present = defaultdict(float)
+            for gram in grams:
+                idf = self._idf.get(gram)
+                if idf is None:
+                    continue
+                for i, weight in self._postings[gram].items():
+                    scores[i] += idf * weight
+                    present[i] += idf
+            for i, idf_sum in present.items():
+                if idf_sum / word_total >= WORD_MATCH_SHARE:
+                    covered[i] += 1
+
+        results = []
+        for i, score in scores.items():
+            row = self.rows[i]
+            if (main_service is None or row[0] == main_service) and (sub_category is None or row[1] == sub_category):
+                results.append((score / total, covered[i] / len(words), i))
+        results.sort(key=lambda item: (-item[0], item[2]))
+        return [
+            {"main_service": self.rows[i][0], "sub_category": self.rows[i][1], "category": self.rows[i][2], "score": round(score, 3), "coverage": round(coverage, 3)}
+            for score, coverage, i in results[:limit]
+        ]
+
+    def best_match(self, query, main_service=None, sub_category=None):
+        """The single row `query` clearly names (enough words found, score and margin over the runner-up), or None."""
+        hits = self.search(query, main_service, sub_category, limit=2)
+        if not hits or hits[0]["score"] < CATALOG_MATCH_MIN_SCORE or hits[0]["coverage"] < CATALOG_MATCH_MIN_COVERAGE:
+            return None
+        if len(hits) > 1 and hits[0]["score"] - hits[1]["score"] < CATALOG_MATCH_MIN_MARGIN:
+            return None
+        return hits[0]
+
+    def stats(self):
+        return {"rows": len(self.rows), "trigrams": len(self._postings)}
@@ -0,0 +1,482 @@
+# backend/conversation.py
+#
+# The /chat conversation engine: one registered handler per stage, looked up by name.
+# Add a stage by decorating `async def handler(turn)` with @stage("name").
+# Input no stage handles goes through the catalog's IntentRouter, then (if still unmatched) the LLM.
+
+import time
+from collections import Counter
+from email_validator import validate_email, EmailNotValidError
+
+from models import ChatResponse
+from option_registry import OptionRegistry
+from catalog_manager import CatalogManager
+from intent_router import looks_like_question
+from mongo_handler import save_lead
+
+BACK_COMMAND = "__GO_BACK__"
+
+# --- PREBUILT UI ELEMENTS ---
+# Built once at import. Treat them as read-only: they are shared by every response.
+INITIAL_CHOICE_BUTTONS = {"type": "buttons", "display_style": "pills", "options": ["Explore Services", "Career Opportunities"]}
+COMPANY_SIZE_DROPDOWN = {"type": "dropdown", "options": ["1-10", "11-50", "51-200", "200+"]}
+GENERATE_BUTTONS = {"type": "buttons", "display_style": "pills", "options": ["Yes, Generate Proposal", "No, Cancel"]}
+CONFIRM_BUTTONS = {"type": "buttons", "options": ["Yes, Generate Proposal", "No, Cancel"]}
+CANCELLED_BUTTONS = {"type": "buttons", "options": ["Create New Proposal", "Contact Support"]}
+SUCCESS_BUTTONS = {"type": "buttons", "options": ["Create Another Proposal", "Visit Website", "Contact Sales"]}
+VISIT_BUTTONS = {"type": "buttons", "options": ["Create Another Proposal", "Contact Sales"]}
+ENGAGEMENT_BUTTONS = {"type": "buttons", "options": ["Create Another Proposal", "Main Menu"]}
+RESUME_RECEIVED_BUTTONS = {"type": "buttons", "options": ["Main Menu", "Visit Website"]}
+CATALOG_MATCH_BUTTONS = {"type": "buttons", "display_style": "pills", "options": ["Yes, Use This Package", "No, Keep My Requirement"]}
+# One label per post_engagement outcome, for snapping free text onto them.
+POST_ENGAGEMENT_CHOICES = ["Create Another Proposal", "Visit Website", "Contact Sales", "Main Menu"]
+
+# Stages without a handler that still must not be pushed onto stage_history.
+UNTRACKED_STAGES = {"ended", "general_chat"}
+
+
+class Turn:
+    """One incoming chat message as seen by a stage handler."""
+    __slots__ = ("stage", "user_details", "user_input", "user_input_lower", "catalog")
+
+    def __init__(self, stage, user_details, user_input, catalog):
+        self.stage = stage
+        self.user_details = user_details
+        self.user_input = user_input
+        self.user_input_lower = user_input.lower()
+        self.catalog = catalog
+
+    def reply(self, next_stage, bot_message, ui_elements=None):
+        return ChatResponse(next_stage=next_stage, bot_message=bot_message, user_details=self.user_details, ui_elements=ui_elements)
+
+
+class StageHandler:
+    """
+    A registered stage: `handle(turn)` returns a ChatResponse, or None to fall back to general chat.
+    `choices` (a list, or a function of the turn) are the button labels the stage matches on;
+    free text that clearly means one of them is replaced by it before the handler runs.
+    `ignore_intents` are intents that must not take the stage over; such input reaches the handler.
+    """
+    def __init__(self, name, handle, track_history=True, choices=None, ignore_intents=()):
+        self.name = name
+        self.handle = handle
+        self.track_history = track_history
+        self.choices = choices
+        self.ignore_intents = frozenset(ignore_intents)
+
+
+STAGES = {}
+COMMANDS = {}
+INTENTS = {}
+
+def stage(name, track_history=True, choices=None, ignore_intents=()):
+    def register(handle):
+        STAGES[name] = StageHandler(name, handle, track_history, choices, ignore_intents)
+        return handle
+    return register
+
+def intent(name):
+    """Registers `async def handler(turn, slot)` for an IntentRouter intent."""
+    def register(handle):
+        INTENTS[name] = handle
+        return handle
+    return register
+
+def command(*phrases):
+    """Registers a handler for exact (lower-cased) inputs that work at any stage."""
+    def register(handle):
+        for phrase in phrases:
+            COMMANDS[phrase] = handle
+        return handle
+    return register
+
+# --- BACK & RESET LOGIC ---
+def go_back_to_stage(previous_stage: str, user_details, options: OptionRegistry) -> ChatResponse:
+    # Intelligent re-prompting logic
+    if previous_stage == "get_name":
+        user_details.pop('name', None)
+        return ChatResponse(next_stage="get_name", bot_message="Let's restart. May I have your **Full Name**?", user_details=user_details)
+    elif previous_stage == "initial_choice":
+        return ChatResponse(next_stage="initial_choice", bot_message=f"Welcome back, **{user_details.get('name')}**. How can we assist you?", user_details=user_details, ui_elements=INITIAL_CHOICE_BUTTONS)
+    elif previous_stage == "get_email":
+        return ChatResponse(next_stage="get_email", bot_message="Please enter your **Business Email Address**.", user_details=user_details)
+    elif previous_stage == "get_phone":
+        return ChatResponse(next_stage="get_phone", bot_message="Please confirm your **Mobile Number**.", user_details=user_details, ui_elements=options.phone_form)
+    elif previous_stage == "get_company":
+        return ChatResponse(next_stage="get_company", bot_message="What is the name of your **Company**?", user_details=user_details)
+
+    return ChatResponse(next_stage=previous_stage, bot_message="Returning to previous step...", user_details=user_details)
+
+# --- COMMANDS ---
+@command("new proposal")
+async def new_proposal(turn):
+    # Hidden start command (Friendly Welcome)
+    turn.user_details = {'stage_history': []}
+    return turn.reply("get_name", "Hello! Welcome to **Infinite Tech**. To get started, please tell me your **Full Name**.")
+
+@command("restart", "reset", "start over")
+async def reset(turn):
+    turn.user_details = {'stage_history': []}
+    return turn.reply("get_name", "System reset. Let's start fresh. May I have your **Full Name**?")
+
+@command("help", "support", "agent")
+async def help_command(turn):
+    return turn.reply(turn.stage, "I am an AI agent designed to generate proposals. If you need human assistance, please email **support@infinitetech.in**.")
+
+async def go_back(turn):
+    if turn.user_details['stage_history']: return go_back_to_stage(turn.user_details['stage_history'].pop(), turn.user_details, turn.catalog.options)
+    return turn.reply(turn.stage, "We are at the beginning of the conversation.")
+
+# --- CONVERSATION STAGES ---
+@stage("get_name", track_history=False)
+async def get_name(turn):
+    # Check if user accidentally typed "new proposal" or just hit enter
+    if len(turn.user_input) < 2 or turn.user_input_lower == "new proposal":
+        return turn.reply("get_name", "Could you please provide your **Full Name**?")
+    turn.user_details['name'] = turn.user_input
+    return turn.reply("initial_choice", f"Pleasure to meet you, **{turn.user_input}**. I am the Infinite Tech AI. How may I assist you today?", INITIAL_CHOICE_BUTTONS)
+
+def ask_for_email(turn):
+    return turn.reply("get_email", "Excellent choice. To generate a custom proposal, I first need your **Business Email Address**.")
+
+def ask_for_job_email(turn):
+    return turn.reply("get_email_for_job", "We are always looking for exceptional talent. Please provide your **Email Address** to start the application.")
+
+@stage("initial_choice", choices=INITIAL_CHOICE_BUTTONS["options"])
+async def initial_choice(turn):
+    if "Service" in turn.user_input:
+        return ask_for_email(turn)
+    elif "Career" in turn.user_input:
+        return ask_for_job_email(turn)
+    # Fallback for "gibberish" or unrecognized input
+    return turn.reply("initial_choice", "I didn't catch that. Please select one of the options below.", INITIAL_CHOICE_BUTTONS)
+
+# --- STRICT EMAIL VALIDATION ---
+@stage("get_email")
+async def get_email(turn):
+    try:
+        valid = validate_email(turn.user_input, check_deliverability=False)
+        turn.user_details['email'] = valid.email
+        return turn.reply("get_phone", "Thank you. Now, please select your **Country** and enter your **Mobile Number**.", turn.catalog.options.phone_form)
+    except EmailNotValidError:
+        # Polite Re-ask Loop
+        return turn.reply("get_email", "I apologize, but that email format seems incorrect. Please enter a valid **name@company.com** address.")
+
+@stage("get_email_for_job")
+async def get_email_for_job(turn):
+    try:
+        valid = validate_email(turn.user_input, check_deliverability=False); turn.user_details['email'] = valid.email
+        return turn.reply("job_application", "Perfect. Please **upload your Resume/CV** (PDF or Docx).", {"type": "file_upload", "upload_to": "/upload-resume", "user_email": turn.user_details['email']})
+    except: return turn.reply("get_email_for_job", "Please provide a valid **Email Address** for our HR team.")
+
+# --- STRICT PHONE VALIDATION ---
+@stage("get_phone")
+async def get_phone(turn):
+    try:
+        if ":" not in turn.user_input: raise ValueError
+        c, p = turn.user_input.split(":", 1)
+        # Remove spaces/dashes
+        p_clean = p.replace(" ", "").replace("-", "")
+        if len(p_clean) < 7 or not p_clean.isdigit(): raise ValueError
+
+        turn.user_details.update({'phone': p, 'country': c})
+        await save_lead(turn.user_details)
+        return turn.reply("get_company", "Details saved. What is the name of your **Company or Organization**?")
+    except:
+        return turn.reply("get_phone", "That phone number appears invalid. Please ensure you select your **Country** and enter a numeric **Mobile Number**.", turn.catalog.options.phone_form)
+
+@stage("get_company")
+async def get_company(turn):
+    if len(turn.user_input) < 2: return turn.reply("get_company", "Could you please provide the full **Company Name**?")
+    turn.user_details['company'] = turn.user_input
+    return turn.reply("get_company_size", "Noted. What is your current **Team Size**?", COMPANY_SIZE_DROPDOWN)
+
+@stage("get_company_size")
+async def get_company_size(turn):
+    turn.user_details['company_size'] = turn.user_input
+    currency_code, budget_buttons = turn.catalog.options.budget_for(turn.user_details['country'])
+    return turn.reply("get_budget", f"What is your estimated **Project Budget** ({currency_code})?", budget_buttons)
+
+@stage("get_budget")
+async def get_budget(turn):
+    turn.user_details['budget'] = turn.user_input
+    # A service named earlier ("I want an app") skips the service menu.
+    if 'preselected_service' in turn.user_details:
+        return select_main_service(turn, turn.user_details.pop('preselected_service'))
+    return ask_for_main_service(turn)
+
+# --- SERVICE SELECTION LOGIC ---
+def ask_for_main_service(turn):
+    return turn.reply("get_main_service", "Which **Service Category** are you interested in?", turn.catalog.options.main_service_cards)
+
+def select_main_service(turn, main_service):
+    catalog, options = turn.catalog, turn.catalog.options
+    turn.user_details['main_service'] = main_service
+    if main_service == "App Development":
+        return turn.reply("get_sub_category", "Please specify the **App Platform**.", options.app_platform_cards)
+    elif main_service in catalog.sub_categories_others:
+        return turn.reply("get_sub_category", "Please select a **Specific Category**.", options.sub_category_cards[main_service])
+    elif main_service in catalog.services_data:
+        return turn.reply("get_specific_service", "Please select the **Service Type**.", options.service_type_cards[main_service])
+    # Robust Fallback
+    return turn.reply("get_main_service", "Please select one of the available services.", options.main_service_cards)
+
+@stage("get_main_service", choices=lambda turn: turn.catalog.main_services)
+async def get_main_service(turn):
+    return select_main_service(turn, turn.user_input)
+
+def sub_category_choices(turn):
+    options, main_service = turn.catalog.options, turn.user_details.get('main_service')
+    cards = options.app_platform_cards if main_service == "App Development" else options.sub_category_cards.get(main_service)
+    return cards["options"] if cards else None
+
+@stage("get_sub_category", choices=sub_category_choices)
+async def get_sub_category(turn):
+    turn.user_details['sub_category'] = turn.user_input; ms = turn.user_details['main_service']
+    return turn.reply("get_specific_service", "Please refine your selection.", turn.catalog.options.refine_for(ms, turn.user_input))
+
+def select_catalog_match(turn, match, bot_message):
+    """Prices a typed request from the catalog row the search index matched it to."""
+    turn.user_details.update({'sub_category': match['sub_category'], 'category': match['category']})
+    turn.user_details.pop('custom_category_name', None)
+    return turn.reply("get_optional_features", bot_message)
+
+def select_custom_requirement(turn, description):
+    turn.user_details.update({'category': "Others", 'custom_category_name': description})
+    return turn.reply("get_optional_features", "Understood. Any **additional requirements**?")
+
+@stage("get_specific_service")
+async def get_specific_service(turn):
+    if "Other" in turn.user_input:
+        turn.user_details['category'] = "Others"; return turn.reply("get_other_service_name", "Please briefly **describe your specific requirement**.")
+    main_service = turn.user_details.get('main_service')
+    if turn.user_input not in turn.catalog.options.refine_for(main_service, turn.user_details.get('sub_category', '_default'))['options']:
+        # Typed rather than clicked: resolve it against the catalog before treating it as custom.
+        match = turn.catalog.search_index.best_match(turn.user_input, main_service)
+        if match is None:
+            return select_custom_requirement(turn, turn.user_input)
+        return select_catalog_match(turn, match, f"That matches our **{match['category']}** package. Are there any **Specific Features** or integrations you need?")
+    turn.user_details['category'] = turn.user_input; turn.user_details.pop('custom_category_name', None)
+    return turn.reply("get_optional_features", "Are there any **Specific Features** or integrations you need?")
+
+@stage("get_other_service_name")
+async def get_other_service_name(turn):
+    match = turn.catalog.search_index.best_match(turn.user_input, turn.user_details.get('main_service'))
+    if match is None:
+        return select_custom_requirement(turn, turn.user_input)
+    # The user chose "Other Requirement", so a catalog match is only offered, never applied.
+    turn.user_details.update({'category': "Others", 'custom_category_name': turn.user_input})
+    turn.user_details['suggested_match'] = {'sub_category': match['sub_category'], 'category': match['category']}
+    return turn.reply("confirm_catalog_match", f"That sounds like our **{match['category']}** package, which we can price from our catalog. Shall we use it?", CATALOG_MATCH_BUTTONS)
+
+@stage("confirm_catalog_match", choices=CATALOG_MATCH_BUTTONS["options"])
+async def confirm_catalog_match(turn):
+    match = turn.user_details.get('suggested_match')
+    if "Yes" in turn.user_input and match:
+        turn.user_details.pop('suggested_match')
+        return select_catalog_match(turn, match, f"Great, we'll price it as our **{match['category']}** package. Any **additional requirements**?")
+    elif "No" in turn.user_input or not match:
+        turn.user_details.pop('suggested_match', None)
+        return select_custom_requirement(turn, turn.user_details.get('custom_category_name', ""))
+    return turn.reply("confirm_catalog_match", "Shall we price it from our catalog package?", CATALOG_MATCH_BUTTONS)
+
+@stage("get_optional_features")
+async def get_optional_features(turn):
+    user_details = turn.user_details
+    user_details['description'] = turn.user_input
+    summary = f"**Proposal Ready**\n\n• **Service:** {user_details.get('custom_category_name', user_details.get('category'))}\n• **Budget:** {user_details.get('budget')}\n• **Email:** {user_details['email']}\n\nShall I generate the PDF now?"
+    return turn.reply("confirm_proposal", summary, GENERATE_BUTTONS)
+
+# "The price is too high" here is about this proposal; the pricing intent would restart service selection.
+@stage("confirm_proposal", track_history=False, choices=GENERATE_BUTTONS["options"], ignore_intents=("pricing",))
+async def confirm_proposal(turn):
+    if "Yes" in turn.user_input:
+        return turn.reply("final_generation", "Processing your request. Please wait...")
+    elif "No" in turn.user_input:
+        return turn.reply("post_engagement", "Request cancelled. Is there anything else I can help you with?", CANCELLED_BUTTONS)
+    return turn.reply("confirm_proposal", "Please confirm: Shall I generate the proposal?", CONFIRM_BUTTONS)
+
+@stage("final_generation", track_history=False)
+async def final_generation(turn):
+    # Note: This message is fetched BEFORE the PDF is done in the background.
+    # Ideally, frontend waits for the "202 Accepted" then this triggers.
+    # But we want the "Continuous Flow".
+    return turn.reply("post_engagement", "**Success!** Your proposal has been sent to your email.\n\nWhile you wait, would you like to explore more?", SUCCESS_BUTTONS)
+
+# --- CONTINUOUS ENGAGEMENT (The Loop) ---
+def visit_website(turn):
+    return turn.reply("post_engagement", "You can visit us at **infinitetechai.com**.", VISIT_BUTTONS)
+
+def contact_sales(turn):
+    return turn.reply("post_engagement", "You can reach our sales team at **sales@infinitetech.in** or +91 9884777171.", ENGAGEMENT_BUTTONS)
+
+@stage("post_engagement", track_history=False, choices=POST_ENGAGEMENT_CHOICES)
+async def post_engagement(turn):
+    user_input = turn.user_input
+    if "Create" in user_input:
+        # Loop back to start (skip name)
+        turn.user_details['stage_history'] = []
+        return turn.reply("initial_choice", f"Certainly, **{turn.user_details.get('name')}**. What service are you looking for this time?", INITIAL_CHOICE_BUTTONS)
+    elif "Visit" in user_input:
+        return visit_website(turn)
+    elif "Sales" in user_input or "Support" in user_input:
+        return contact_sales(turn)
+    elif "Main Menu" in user_input:
+        return turn.reply("initial_choice", "Main Menu:", INITIAL_CHOICE_BUTTONS)
+    return turn.reply("post_engagement", "How else can I help?", ENGAGEMENT_BUTTONS)
+
+@stage("job_application")
+async def job_application(turn):
+    if "Uploaded" in turn.user_input:
+        return turn.reply("post_engagement", "Resume received successfully. Our HR team will review it. Good luck!", RESUME_RECEIVED_BUTTONS)
+    return None
+
+
+# --- LOCAL INTENTS ---
+# Free text that no stage handled, classified by the catalog's IntentRouter instead of the LLM.
+def ask_for_lead_detail(turn):
+    """Prompt for the first lead detail a proposal still needs, or None once they are all known."""
+    user_details, options = turn.user_details, turn.catalog.options
+    if not user_details.get('name'):
+        return turn.reply("get_name", "Happy to help with that. First, may I have your **Full Name**?")
+    if not user_details.get('email'):
+        return ask_for_email(turn)
+    if not user_details.get('country'):
+        return turn.reply("get_phone", "Please select your **Country** and enter your **Mobile Number**.", options.phone_form)
+    if not user_details.get('company'):
+        return turn.reply("get_company", "What is the name of your **Company or Organization**?")
+    if not user_details.get('company_size'):
+        return turn.reply("get_company_size", "What is your current **Team Size**?", COMPANY_SIZE_DROPDOWN)
+    if not user_details.get('budget'):
+        currency_code, budget_buttons = options.budget_for(user_details['country'])
+        return turn.reply("get_budget", f"What is your estimated **Project Budget** ({currency_code})?", budget_buttons)
+    return None
+
+@intent("service")
+async def service_intent(turn, main_service):
+    # Remembered until the lead details are in; get_budget then selects it.
+    turn.user_details['preselected_service'] = main_service
+    response = ask_for_lead_detail(turn)
+    if response is not None:
+        return response
+    return select_main_service(turn, turn.user_details.pop('preselected_service'))
+
+@intent("pricing")
+async def pricing_intent(turn, _):
+    return ask_for_lead_detail(turn) or ask_for_main_service(turn)
+
+@intent("careers")
+async def careers_intent(turn, _):
+    return ask_for_job_email(turn)
+
+@intent("contact")
+async def contact_intent(turn, _):
+    return contact_sales(turn)
+
+@intent("website")
+async def website_intent(turn, _):
+    return visit_website(turn)
+
+@intent("back")
+async def back_intent(turn, _):
+    # Unlike BACK_COMMAND this arrives after dispatch() recorded the current stage; undo that first.
+    history = turn.user_details['stage_history']
+    if history and history[-1] == turn.stage: history.pop()
+    return await go_back(turn)
+
+@intent("restart")
+async def restart_intent(turn, _):
+    return await reset(turn)
+
+
+# --- ENGINE ---
+class ConversationEngine:
+    """
+    Dispatches a chat turn to its command or stage handler with one dict lookup each, and
+    times every handler. Timing hooks are called as hook(stage_name, seconds).
+    A conversation is pinned to the catalog version it started on (user_details['catalog_version']).
+    Input no stage handles is routed by intent; dispatch() returns None only for what's left.
+    """
+    def __init__(self, catalogs: CatalogManager):
+        self.catalogs = catalogs
+        self.timing_hooks = [self._record_timing]
+        self._timings = {}
+        self._routing = Counter()
+
+    def add_timing_hook(self, hook):
+        self.timing_hooks.append(hook)
+
+    async def dispatch(self, stage_name, user_details, user_input):
+        """Returns the ChatResponse for this turn, or None when no stage handles the input."""
+        user_input = user_input.strip() if user_input else ""
+        if 'stage_history' not in user_details: user_details['stage_history'] = []
+        catalog = self.catalogs.resolve(user_details.get('catalog_version'))
+        user_details['catalog_version'] = catalog.version
+        turn = Turn(stage_name, user_details, user_input, catalog)
+
+        handle = COMMANDS.get(turn.user_input_lower)
+        if handle is not None:
+            return await self._timed(f"command:{turn.user_input_lower}", handle, turn)
+        if user_input == BACK_COMMAND:
+            return await self._timed("command:back", go_back, turn)
+
+        handler = STAGES.get(stage_name)
+        # History Tracking
+        if (handler.track_history if handler else stage_name not in UNTRACKED_STAGES):
+            if not user_details['stage_history'] or user_details['stage_history'][-1] != stage_name:
+                user_details['stage_history'].append(stage_name)
+        if handler is not None:
+            # Button stages only re-ask on input they don't recognise, so interpret it first:
+            # a typo of a button becomes the button, "go back"/"I want an app" becomes an intent,
+            # and an open question goes to the LLM.
+            choices = handler.choices(turn) if callable(handler.choices) else handler.choices
+            if choices and user_input not in choices:
+                snapped = catalog.intents.snap(user_input, choices)
+                if snapped is not None:
+                    self._routing["snapped"] += 1
+                    turn.user_input, turn.user_input_lower = snapped, snapped.lower()
+                else:
+                    found = catalog.intents.classify(user_input)
+                    if found is not None and found.name not in handler.ignore_intents:
+                        return await self._route(turn, found)
+                    if looks_like_question(user_input):
+                        return await self._route(turn, None)
+            response = await self._timed(stage_name, handler.handle, turn)
+            if response is not None:
+                return response
+        return await self._route(turn, turn.catalog.intents.classify(turn.user_input))
+
+    async def _route(self, turn, found):
+        if found is None:
+            self._routing["llm_fallback"] += 1
+            return None
+        self._routing[f"intent:{found.name}"] += 1
+        handle = INTENTS[found.name]
+        return await self._timed(f"intent:{found.name}", lambda t: handle(t, found.slot), turn)
+
+    async def _timed(self, name, handle, turn):
+        start = time.perf_counter()
+        try:
+            return await handle(turn)
+        finally:
+            elapsed = time.perf_counter() - start
+            for hook in self.timing_hooks:
+                hook(name, elapsed)
+
+    def _record_timing(self, name, seconds):
+        entry = self._timings.setdefault(name, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["calls"] += 1
+        entry["total_ms"] += seconds * 1000
+        entry["max_ms"] = max(entry["max_ms"], seconds * 1000)
+
+    def routing_stats(self):
+        """How unhandled input was resolved: snapped onto a button, a local intent, or the LLM."""
+        local = sum(n for key, n in self._routing.items() if key.startswith("intent:"))
+        total = local + self._routing["llm_fallback"]
+        return {**dict(sorted(self._routing.items())), "local_share": round(local / total, 3) if total else None}
+
+    def stats(self):
+        return {
+            name: {"calls": t["calls"], "avg_ms": round(t["total_ms"] / t["calls"], 3), "max_ms": round(t["max_ms"], 3)}
+            for name, t in sorted(self._timings.items())
+        }
@@ -0,0 +1,139 @@
+# backend/custom_estimator.py
+
+import os
+import statistics
+
+from cache import TTLCache, normalize_text
+from llm_handler import estimate_custom_service_cost
+from proposal_logic import COST_COMPONENTS, OPTIONAL_ADDONS, safe_float
+
+ESTIMATE_EXAMPLES = int(os.getenv("ESTIMATE_EXAMPLES", "3"))
+ESTIMATE_CACHE_SIZE = int(os.getenv("ESTIMATE_CACHE_SIZE", "1024"))
+ESTIMATE_CACHE_TTL_SECONDS = float(os.getenv("ESTIMATE_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# How far outside the main service's catalog price range an estimate may land before it is scaled back.
+ESTIMATE_RANGE_SLACK = float(os.getenv("ESTIMATE_RANGE_SLACK", "0.25"))
+
+COMPONENT_COLUMNS = [column for _, column in COST_COMPONENTS]
+COST_COLUMNS = COMPONENT_COLUMNS + [OPTIONAL_ADDONS[1]]
+
+def components_subtotal(row):
+    return sum(safe_float(row.get(column)) for column in COMPONENT_COLUMNS)
+
+
+class CustomEstimator:
+    """
+    Costs for "Other Requirement" requests, anchored to one catalog version:
+
+    - the k most similar *priced* catalog rows (via the catalog's search index) are the LLM's
+      few-shot examples;
+    - the LLM's breakdown is checked and scaled into the main service's catalog price range;
+    - without a usable LLM answer, the breakdown is the similarity-weighted mean of those rows,
+      so a custom quote is never zero;
+    - results are cached by (main service, normalized request).
+    """
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.cache = TTLCache(max_size=ESTIMATE_CACHE_SIZE, ttl=ESTIMATE_CACHE_TTL_SECONDS)
+        self.counts = {"llm": 0, "neighbours": 0, "scaled_into_range": 0}
+
+        self._priced = {}  # main_service -> {(main_service, sub_category, category): row}
+        for main_service, sub_categories in catalog.services_data.items():
+            for sub_category, categories in sub_categories.items():
+                for category, row in categories.items():
+                    if components_subtotal(row) > 0:
+                        self._priced.setdefault(main_service, {})[(main_service, sub_category, category)] = row
+        self._everything = {key: row for rows in self._priced.values() for key, row in rows.items()}
+        # main_service -> (lowest, highest) component subtotal of its priced rows; services without any have no range
+        self.ranges = {
+            main_service: (min(map(components_subtotal, rows.values())), max(map(components_subtotal, rows.values())))
+            for main_service, rows in self._priced.items()
+        }
+        # A catalog without priced rows has no range at all: LLM estimates are then taken as they are.
+        self._overall_range = (min(low for low, _ in self.ranges.values()), max(high for _, high in self.ranges.values())) if self.ranges else None
+
+    def examples_for(self, service_name, main_service, k=ESTIMATE_EXAMPLES):
+        """[(similarity, row)] for the k most similar priced rows (nearest to the median price when nothing matches)."""
+        known_service = main_service in self._priced
+        candidates = self._priced[main_service] if known_service else self._everything
+        if not candidates:
+            return []
+        hits = self.catalog.search_index.search(service_name, main_service if known_service else None, limit=len(self.catalog.search_index.rows))
+        examples = []
+        for hit in hits:
+            key = (hit["main_service"], hit["sub_category"], hit["category"])
+            if key in candidates and len(examples) < k:
+                examples.append((hit["score"], candidates[key]))
+        if len(examples) < k:
+            # Pad with the rows closest to the service's median price, which is the least surprising anchor.
+            median = statistics.median(map(components_subtotal, candidates.values()))
+            chosen = {id(row) for _, row in examples}
+            rest = sorted((row for row in candidates.values() if id(row) not in chosen), key=lambda row: abs(components_subtotal(row) - median))
+            examples += [(0.0, row) for row in rest[:k - len(examples)]]
+        return examples
+
+    def _validated(self, estimate, main_service):
+        """The estimate's cost columns as non-negative numbers, scaled into the catalog range; None if unusable."""
+        costs = {column: safe_float(estimate.get(column)) for column in COST_COLUMNS}
+        if any(value < 0 or value != value or value == float("inf") for value in costs.values()):
+            return None
+        subtotal = sum(costs[column] for column in COMPONENT_COLUMNS)
+        if subtotal <= 0:
+            return None
+        price_range = self.ranges.get(main_service, self._overall_range)
+        if price_range is None:
+            return {column: int(round(value)) for column, value in costs.items()}
+        low, high = price_range
+        low, high = low * (1 - ESTIMATE_RANGE_SLACK), high * (1 + ESTIMATE_RANGE_SLACK)
+        if not low <= subtotal <= high:
+            factor = (low if subtotal < low else high) / subtotal
+            costs = {column: value * factor for column, value in costs.items()}
+            self.counts["scaled_into_range"] += 1
+        return {column: int(round(value)) for column, value in costs.items()}
+
+    def _from_neighbours(self, examples):
+        if not examples:
+            return {column: 0 for column in COST_COLUMNS}
+        weights = [similarity for similarity, _ in examples]
+        if not any(weights):
+            weights = [1.0] * len(examples)
+        total = sum(weights)
+        return {
+            column: int(round(sum(w * safe_float(row.get(column)) for w, (_, row) in zip(weights, examples)) / total))
+            for column in COST_COLUMNS
+        }
+
+    async def estimate(self, service_name, main_service):
+        """A catalog-shaped row (category, project_overview, core_modules, *_cost_inr, avg_cost_inr) for a custom request."""
+        key = (main_service, normalize_text(service_name))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        examples = self.examples_for(service_name, main_service)
+        estimate = await estimate_custom_service_cost(service_name, main_service, [row for _, row in examples]) or {}
+        costs = self._validated(estimate, main_service)
+        if costs is not None:
+            source = "llm"
+        else:
+            costs = self._from_neighbours(examples)
+            source = "neighbours"
+        self.counts[source] += 1
+
+        nearest = examples[0][1] if examples else {}
+        row = {
+            "category": service_name,
+            "sub_category": "_default",
+            "main_service": main_service,
+            "project_overview": estimate.get("project_overview") or f"A custom {main_service} project: {service_name}.",
+            "core_modules": estimate.get("core_modules") or nearest.get("core_modules", ""),
+            **costs,
+            "avg_cost_inr": sum(costs[column] for column in COMPONENT_COLUMNS),
+            "estimate_source": source,
+            "estimate_examples": [row.get("category") for _, row in examples],
+        }
+        print(f"--- Custom estimate for '{service_name}' ({main_service}) from {source}: INR {row['avg_cost_inr']:,} ---")
+        self.cache.set(key, row)
+        return dict(row)
+
+    def stats(self):
+        return {**self.counts, "cache": self.cache.stats()}
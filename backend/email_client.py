@@ -0,0 +1,205 @@
+# backend/email_client.py
+
+import os
+import json
+import time
+import uuid
+import base64
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- Configuration ---
+# MAILJET_API_URL can point at a local fake server (see benchmarks/fake_mailjet.py) for testing.
+MAILJET_API_URL = os.getenv("MAILJET_API_URL", "https://api.mailjet.com/v3.1/send")
+MAILJET_CONNECT_TIMEOUT = float(os.getenv("MAILJET_CONNECT_TIMEOUT", "5"))
+MAILJET_READ_TIMEOUT = float(os.getenv("MAILJET_READ_TIMEOUT", "30"))
+MAILJET_RETRIES = int(os.getenv("MAILJET_RETRIES", "3"))
+MAILJET_BACKOFF_SECONDS = float(os.getenv("MAILJET_BACKOFF_SECONDS", "1"))
+MAILJET_BATCH_SIZE = 50  # Mailjet v3.1 accepts at most 50 messages per call
+OUTBOX_DIR = os.getenv("EMAIL_OUTBOX_DIR", os.path.join(os.path.dirname(__file__), "outbox"))
+OUTBOX_CLAIM_TIMEOUT_SECONDS = 600
+# Deliveries (first send included) before an outbox entry is given up on and moved to OUTBOX_DIR/failed.
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "10"))
+SENDER_NAME = "Infinite Tech AI"
+
+_session = None
+
+def get_session():
+    """One pooled session per process, so sends reuse warm TCP+TLS connections."""
+    global _session
+    if _session is None:
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=10))
+        session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=10))
+        _session = session
+    return _session
+
+def pdf_attachment(file_name: str, pdf_bytes: bytes):
+    return {
+        "ContentType": "application/pdf",
+        "Filename": file_name,
+        "Base64Content": base64.b64encode(pdf_bytes).decode('utf-8')
+    }
+
+def build_message(receiver_email, subject, body, attachments=None):
+    """Builds one Mailjet v3.1 message from a plain-text body."""
+    return {
+        "From": {
+            "Email": os.getenv("EMAIL_ADDRESS"), # Your verified Mailjet email
+            "Name": SENDER_NAME
+        },
+        "To": [
+            {
+                "Email": receiver_email
+            }
+        ],
+        "Subject": subject,
+        "HTMLPart": f"<p>{body.replace(chr(10), '<br>')}</p>",
+        "Attachments": attachments or []
+    }
+
+def send_messages(messages: list, attempts: list | None = None):
+    """
+    Sends messages in as few Mailjet calls as possible, retrying transient failures
+    (network errors, timeouts, 429, 5xx) with exponential backoff. Returns one bool per message;
+    every message that is not delivered is written to the outbox for a later flush_outbox().
+    `attempts` are the deliveries already tried per message (outbox retries pass them on).
+    """
+    attempts = attempts or [0] * len(messages)
+    api_key = os.getenv("MAILJET_API_KEY")
+    api_secret = os.getenv("MAILJET_SECRET_KEY")
+    if not api_key or not api_secret:
+        print("❌ Error: Mailjet Keys are missing.")
+        failures = [("Mailjet keys are missing", False)] * len(messages)
+    else:
+        failures = []
+        for i in range(0, len(messages), MAILJET_BATCH_SIZE):
+            failures.extend(_send_batch(messages[i:i + MAILJET_BATCH_SIZE], (api_key, api_secret)))
+
+    for message, failure, tried in zip(messages, failures, attempts):
+        if failure is not None:
+            error, permanent = failure
+            save_to_outbox(message, error, tried + 1, permanent)
+    return [failure is None for failure in failures]
+
+def _send_batch(batch, auth):
+    """One entry per message: None if delivered, else (error, permanent)."""
+    recipients = ", ".join(m["To"][0]["Email"] for m in batch)
+    last_error = None
+    for attempt in range(1, MAILJET_RETRIES + 1):
+        try:
+            print(f"📧 Sending {len(batch)} email(s) via Mailjet API to {recipients}...")
+            response = get_session().post(
+                MAILJET_API_URL,
+                auth=auth,
+                json={"Messages": batch},
+                timeout=(MAILJET_CONNECT_TIMEOUT, MAILJET_READ_TIMEOUT),
+            )
+        except requests.RequestException as e:
+            last_error = f"API Request Failed: {e}"
+        else:
+            if response.status_code == 429 or response.status_code >= 500:
+                last_error = f"Status {response.status_code}: {response.text[:200]}"
+            else:
+                return _handle_response(batch, response)
+
+        print(f"⚠️ Mailjet send failed (attempt {attempt}/{MAILJET_RETRIES}): {last_error}")
+        if attempt < MAILJET_RETRIES:
+            time.sleep(MAILJET_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+
+    return [(last_error, False)] * len(batch)
+
+def _handle_response(batch, response):
+    """
+    Maps Mailjet's per-message statuses back onto the batch. Each message is judged by its own
+    Status whatever the HTTP code (a 400 can still have delivered some of the batch); a message
+    Mailjet rejected itself (bad address, invalid content) is a permanent failure.
+    """
+    try:
+        statuses = response.json().get("Messages", [])
+    except (ValueError, AttributeError):
+        statuses = []
+
+    results = []
+    for i, message in enumerate(batch):
+        status = statuses[i] if i < len(statuses) else None
+        if status is None:
+            # No per-message answer (auth error, malformed body): only a 200 means it went out.
+            ok = response.status_code == 200
+            failure = None if ok else (f"Status {response.status_code}: {response.text[:200]}", False)
+        elif status.get("Status") == "success":
+            failure = None
+        else:
+            failure = (json.dumps(status.get("Errors")) if status.get("Errors") else f"Status {response.status_code}: {response.text[:200]}", True)
+        if failure is not None:
+            print(f"❌ Failed to send email to {message['To'][0]['Email']}. {failure[0]}")
+        results.append(failure)
+
+    if not any(results):
+        print(f"✅ {len(batch)} email(s) sent successfully!")
+    return results
+
+# --- OUTBOX ---
+def save_to_outbox(message, error, attempts=1, permanent=False):
+    """
+    Persists an undelivered message as one JSON file so nothing is silently dropped. Permanent
+    failures, and messages that failed OUTBOX_MAX_ATTEMPTS times, go to OUTBOX_DIR/failed,
+    which flush_outbox() never retries.
+    """
+    dead = permanent or attempts >= OUTBOX_MAX_ATTEMPTS
+    directory = os.path.join(OUTBOX_DIR, "failed") if dead else OUTBOX_DIR
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{int(time.time())}_{uuid.uuid4().hex}.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump({"message": message, "error": error, "attempts": attempts, "saved_at": time.time()}, f)
+        os.replace(f"{path}.tmp", path)
+        if dead:
+            print(f"❌ Email to {message['To'][0]['Email']} given up after {attempts} attempt(s), moved to {directory}.")
+        else:
+            print(f"📥 Email to {message['To'][0]['Email']} saved to outbox.")
+    except Exception as e:
+        print(f"❌ CRITICAL: Could not write email to outbox: {e}")
+
+def flush_outbox():
+    """
+    Retries every message in the outbox in batched calls. Files are claimed by renaming them,
+    so several worker processes can flush concurrently without double-sending.
+    Returns (sent, still_pending).
+    """
+    if not os.path.isdir(OUTBOX_DIR):
+        return 0, 0
+
+    claimed = []
+    for name in sorted(os.listdir(OUTBOX_DIR)):
+        path = os.path.join(OUTBOX_DIR, name)
+        if name.endswith(".sending"):
+            # Left behind by a process that died mid-flush: release it for the next pass.
+            if time.time() - os.path.getmtime(path) > OUTBOX_CLAIM_TIMEOUT_SECONDS:
+                os.rename(path, path.split(".json.")[0] + ".json")
+            continue
+        if not name.endswith(".json"):
+            continue
+        sending = f"{path}.{os.getpid()}.sending"
+        try:
+            os.rename(path, sending)
+            os.utime(sending)  # the claim's age starts now
+        except OSError:
+            continue  # another process took it
+        try:
+            with open(sending, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            claimed.append((sending, entry["message"], entry.get("attempts", 1)))
+        except Exception as e:
+            print(f"⚠️ Unreadable outbox entry '{name}': {e}")
+            os.rename(sending, path)
+
+    if not claimed:
+        return 0, 0
+
+    # Failed messages are re-saved to the outbox (or failed/) by send_messages itself.
+    results = send_messages([message for _, message, _ in claimed], [attempts for _, _, attempts in claimed])
+    for sending, _, _ in claimed:
+        os.remove(sending)
+    sent = sum(results)
+    return sent, len(results) - sent
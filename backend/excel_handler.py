@@ -1,4 +1,3 @@
-import pandas as pd
 import os
 from collections import defaultdict
 
@@ -17,6 +16,9 @@ def load_service_data():
     Loads data from all service files. Assumes all files now contain the 'sub_category'
     column for consistent grouping.
     """
+    # Imported here so that loading the compiled snapshot (catalog_compiler.py) never pays for pandas.
+    import pandas as pd
+
     app_sub_category_definitions = defaultdict(list)
     all_dataframes = []
     
@@ -0,0 +1,253 @@
+# backend/intent_router.py
+#
+# Local intent classifier for chat input that no stage handles. Keyword rules catch the common
+# short forms ("go back", "I want an app", "pricing"); a TF-IDF model over catalog names and
+# stage vocabulary catches the rest. Only input that matches neither goes to the LLM.
+
+import os
+import re
+import math
+from collections import Counter, defaultdict
+
+from knowledge_base import stem
+from cache import TTLCache
+
+INTENT_ROUTER_ENABLED = os.getenv("INTENT_ROUTER", "1") != "0"
+ROUTER_MIN_SCORE = float(os.getenv("ROUTER_MIN_SCORE", "0.6"))
+ROUTER_MIN_MARGIN = float(os.getenv("ROUTER_MIN_MARGIN", "0.1"))
+# Spelling corrections remembered per router; bounded because the tokens come from public chat input.
+ROUTER_CORRECTION_CACHE_SIZE = int(os.getenv("ROUTER_CORRECTION_CACHE_SIZE", "4096"))
+
+STOPWORDS = {
+    "a", "an", "and", "are", "be", "can", "do", "does", "for", "get", "give", "i", "im", "in", "is", "it",
+    "like", "looking", "me", "my", "need", "of", "on", "or", "our", "please", "some", "that", "the",
+    "this", "to", "us", "want", "we", "with", "would", "you", "your",
+}
+QUESTION_WORDS = {"what", "why", "how", "who", "where", "when", "which", "is", "are", "do", "does", "can", "could", "should", "will", "would", "tell"}
+YES_WORDS = {"yes", "yeah", "yep", "yup", "sure", "ok", "okay", "y", "proceed", "confirm"}
+NO_WORDS = {"no", "nope", "nah", "n", "cancel", "stop"}
+
+# word (or raw 'a_b' bigram) -> intent. Service aliases are only used for services present in the catalog.
+KEYWORD_RULES = {
+    "price": "pricing", "prices": "pricing", "pricing": "pricing", "cost": "pricing", "costs": "pricing",
+    "quote": "pricing", "quotation": "pricing", "estimate": "pricing", "rates": "pricing", "how_much": "pricing",
+    "job": "careers", "jobs": "careers", "career": "careers", "careers": "careers", "hiring": "careers",
+    "resume": "careers", "cv": "careers", "internship": "careers", "vacancy": "careers",
+    "back": "back", "previous": "back", "undo": "back",
+    "restart": "restart", "start_over": "restart", "start_again": "restart",
+    "contact": "contact", "sales": "contact", "call_me": "contact", "human": "contact",
+    "visit_website": "website", "your_website": "website", "visit": "website",
+}
+SERVICE_ALIASES = {
+    "App Development": ["app", "apps", "android", "ios", "mobile", "iphone"],
+    "Web Development": ["web", "website", "site", "ecommerce", "landing_page", "wordpress"],
+    "Digital Marketing Services": ["marketing", "market", "ads", "advertising", "social_media", "campaign"],
+    "SEO Services": ["seo", "ranking", "google_ranking"],
+    "AI Development Services": ["ai", "chatbot", "ml", "machine_learning", "llm", "automation"],
+    "Software Development Services": ["software", "erp", "crm", "saas"],
+}
+# Extra training phrases for the non-service intents.
+INTENT_PHRASES = {
+    "pricing": ["show me pricing", "how much does it cost", "get a quote", "price list", "what are your rates", "estimate my project", "create a proposal"],
+    "careers": ["apply for a job", "career opportunities", "are you hiring", "send my resume", "job openings"],
+    "back": ["go back", "previous step", "back one step", "undo that"],
+    "restart": ["start over", "start again", "restart the chat", "begin again"],
+    "contact": ["contact sales", "talk to a human", "speak to someone", "call me back", "contact support"],
+    "website": ["visit website", "your website", "website link"],
+}
+
+
+def words_of(text):
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+def looks_like_question(text, words=None):
+    """Ends with '?' or opens with a question word ("what services do you offer")."""
+    words = words_of(text) if words is None else words
+    return text.rstrip().endswith("?") or (bool(words) and words[0] in QUESTION_WORDS)
+
+def features(words):
+    """Stemmed, stop-word free unigrams plus raw adjacent bigrams ('how_much')."""
+    unigrams = [stem(w) for w in words if w not in STOPWORDS]
+    bigrams = [f"{a}_{b}" for a, b in zip(words, words[1:])]
+    return unigrams, bigrams
+
+def _deletes(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def _edit_distance_at_most_one(a, b):
+    """Optimal string alignment distance <= 1 (one insert, delete, substitute or adjacent swap)."""
+    if a == b: return True
+    if abs(len(a) - len(b)) > 1: return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        return len(diff) == 1 or (len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+    if len(a) > len(b): a, b = b, a
+    return any(a == b[:i] + b[i + 1:] for i in range(len(b)))
+
+
+class Intent:
+    __slots__ = ("name", "slot", "score", "source")
+
+    def __init__(self, name, slot=None, score=1.0, source="rule"):
+        self.name = name
+        self.slot = slot
+        self.score = score
+        self.source = source
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, {self.slot!r}, {self.score:.2f}, {self.source!r})"
+
+
+class IntentRouter:
+    """
+    Built from one catalog version (like its OptionRegistry). classify(text) returns an Intent
+    (name in 'service' | 'pricing' | 'careers' | 'back' | 'restart' | 'contact' | 'website'; slot is the
+    main service for 'service') or None when the text should go to the LLM.
+    snap(text, choices) maps a typo or paraphrase of a button label to that label.
+    """
+    def __init__(self, catalog):
+        # Unigram keys are stemmed like the input; bigram keys ('how_much') stay raw.
+        def rule_key(key): return key if "_" in key else stem(key)
+        self.rules = {rule_key(key): intent for key, intent in KEYWORD_RULES.items()}
+        for main_service, aliases in SERVICE_ALIASES.items():
+            if main_service in catalog.services_data:
+                for alias in aliases:
+                    self.rules[rule_key(alias)] = ("service", main_service)
+
+        examples = [(phrase, (name, None)) for name, phrases in INTENT_PHRASES.items() for phrase in phrases]
+        for main_service, sub_categories in catalog.services_data.items():
+            examples.append((main_service, ("service", main_service)))
+            for sub_category, categories in sub_categories.items():
+                if sub_category != "_default":
+                    examples.append((sub_category, ("service", main_service)))
+                examples.extend((category, ("service", main_service)) for category in categories)
+        for platform, categories in catalog.app_sub_category_definitions.items():
+            examples.append((platform, ("service", "App Development")))
+            examples.extend((category, ("service", "App Development")) for category in categories)
+
+        self._labels = []
+        vectors = []
+        # Function words are "known" so they are never spell-corrected into something else.
+        vocabulary = YES_WORDS | NO_WORDS | STOPWORDS | QUESTION_WORDS
+        for key in list(KEYWORD_RULES) + [alias for aliases in SERVICE_ALIASES.values() for alias in aliases]:
+            vocabulary.update(key.split("_"))
+        for text, label in examples:
+            words = words_of(text)
+            vocabulary.update(words)
+            unigrams, bigrams = features(words)
+            if unigrams:
+                self._labels.append(label)
+                vectors.append(Counter(unigrams + bigrams))
+
+        doc_freq = Counter(term for vector in vectors for term in vector)
+        n = len(vectors)
+        self._idf = {term: math.log((1 + n) / (1 + df)) + 1 for term, df in doc_freq.items()}
+        # term -> [(example index, weight)], with example vectors L2-normalised.
+        self._postings = defaultdict(list)
+        for i, vector in enumerate(vectors):
+            weights = {term: tf * self._idf[term] for term, tf in vector.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values()))
+            for term, w in weights.items():
+                self._postings[term].append((i, w / norm))
+
+        # Spelling correction of raw words against everything the router knows, via shared single-character deletes.
+        self._vocabulary = vocabulary
+        self._deletes = defaultdict(set)
+        for word in self._vocabulary:
+            if len(word) >= 4:
+                for variant in _deletes(word) | {word}:
+                    self._deletes[variant].add(word)
+        # Corrections only depend on the vocabulary, which is fixed for this router, so they never expire.
+        self._corrections = TTLCache(max_size=ROUTER_CORRECTION_CACHE_SIZE, ttl=float("inf"))
+
+    def correct(self, token):
+        # Three-letter words have too many neighbours ("com" -> "crm") to correct safely.
+        if token in self._vocabulary or len(token) < 4 or token.isdigit():
+            return token
+        corrected = self._corrections.get(token)
+        if corrected is None:
+            candidates = set()
+            for variant in _deletes(token) | {token}:
+                candidates |= self._deletes.get(variant, set())
+            matches = sorted(word for word in candidates if _edit_distance_at_most_one(token, word))
+            corrected = matches[0] if len(matches) == 1 else token
+            self._corrections.set(token, corrected)
+        return corrected
+
+    def classify(self, text):
+        if not INTENT_ROUTER_ENABLED or not text or "@" in text:
+            return None
+        raw = [self.correct(w) for w in words_of(text)]
+        words, bigrams = features(raw)
+        if not words and not bigrams:
+            return None
+        question = looks_like_question(text, raw)
+
+        hits = [self.rules[t] for t in bigrams + words if t in self.rules]
+        services = {hit[1] for hit in hits if isinstance(hit, tuple)}
+        intents = {hit for hit in hits if not isinstance(hit, tuple)}
+        # Open questions ("do you work with hospitals?") are the LLM's job, unless they ask about price.
+        if question and "pricing" not in intents:
+            return None
+        if hits:
+            if "website" in intents:
+                return Intent("website")  # "visit your website" is about us, not a web project
+            if len(services) == 1:
+                return Intent("service", services.pop())
+            if not services and len(intents) == 1:
+                return Intent(intents.pop())
+            if not services and "pricing" in intents:
+                return Intent("pricing")
+
+        scores = defaultdict(float)
+        query = Counter(words + bigrams)
+        weights = {term: tf * self._idf[term] for term, tf in query.items() if term in self._idf}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        for term, w in weights.items():
+            for i, example_weight in self._postings[term]:
+                scores[i] += w / norm * example_weight
+        # Best example per label; the winner has to beat the runner-up label clearly.
+        by_label = {}
+        for i, score in scores.items():
+            by_label[self._labels[i]] = max(score, by_label.get(self._labels[i], 0.0))
+        ranked = sorted(by_label.items(), key=lambda item: item[1], reverse=True)
+        if not ranked or ranked[0][1] < ROUTER_MIN_SCORE:
+            return None
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < ROUTER_MIN_MARGIN:
+            return None
+        (name, slot), score = ranked[0]
+        return Intent(name, slot, score, "tfidf")
+
+    def snap(self, text, choices):
+        """
+        The one choice `text` clearly refers to, or None (also when it already is a choice).
+        Questions, and input with both a yes and a no word ("nope, yes"), are never snapped.
+        """
+        if not INTENT_ROUTER_ENABLED or not text or text in choices or looks_like_question(text):
+            return None
+        choice_words = {choice: set(words_of(choice)) for choice in choices}
+        known = set().union(*choice_words.values()) | YES_WORDS | NO_WORDS
+        words = set()
+        for word in words_of(text):
+            if word not in known and len(word) >= 3:
+                close = [k for k in known if _edit_distance_at_most_one(word, k)]
+                word = close[0] if len(close) == 1 else word
+            words.add("yes" if word in YES_WORDS else "no" if word in NO_WORDS else stem(word))
+        if "yes" in words and "no" in words:
+            return None
+        # Only words that single out one choice count ("services" in four labels says nothing).
+        stems = {choice: {stem(w) for w in choice_words[choice]} for choice in choices}
+        shared = Counter(w for choice_stems in stems.values() for w in choice_stems)
+        scores = {}
+        for choice in choices:
+            overlap = len({w for w in words & stems[choice] if shared[w] == 1})
+            if overlap:
+                scores[choice] = overlap / len(stems[choice])
+        if not scores:
+            intent = self.classify(text)
+            return intent.slot if intent and intent.name == "service" and intent.slot in choices else None
+        # Like classify(), the winner has to beat the runner-up clearly.
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < ROUTER_MIN_MARGIN:
+            return None
+        return ranked[0][0]
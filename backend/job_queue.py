@@ -0,0 +1,157 @@
+# backend/job_queue.py
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+JOB_DB_PATH = os.getenv("JOB_DB_PATH", os.path.join(os.path.dirname(__file__), "proposal_jobs.db"))
+# A running job whose worker hasn't reported progress for this long is assumed dead and re-queued.
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# A failed job waits JOB_RETRY_BASE_SECONDS before its second attempt, doubling per attempt up to JOB_RETRY_MAX_SECONDS.
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+JOB_RETRY_MAX_SECONDS = float(os.getenv("JOB_RETRY_MAX_SECONDS", "900"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    step TEXT,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    timings TEXT,
+    run_after REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+"""
+
+
+def retry_delay(attempts: int):
+    """Seconds to wait before the attempt after `attempts` failed ones."""
+    return min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** max(0, attempts - 1))
+
+
+class JobQueue:
+    """
+    Durable job queue in a local SQLite file, safe to share between the web process and
+    any number of worker processes. Statuses: queued -> running -> completed | failed.
+    Every method blocks (up to the 30 s busy timeout), so async code calls them via asyncio.to_thread.
+    """
+    def __init__(self, path: str = JOB_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            if "timings" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN timings TEXT")
+            if "run_after" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN run_after REAL NOT NULL DEFAULT 0")
+
+    @contextmanager
+    def _connect(self):
+        # One connection per thread (sqlite3 connections can't cross threads), opened on first use.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        yield conn
+
+    def enqueue(self, kind: str, payload: dict):
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, status, step, payload, created_at, updated_at) VALUES (?, ?, 'queued', 'queued', ?, ?, ?)",
+                (job_id, kind, json.dumps(payload, default=str), now, now),
+            )
+        return job_id
+
+    def claim(self):
+        """
+        Atomically takes the oldest due queued job (or an expired running one) and marks it running.
+        Returns the job as a dict, or None if there is nothing to do. Expired jobs that already
+        used their last attempt are marked failed first, since no worker will pick them up again.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = 'lease expired', updated_at = ? WHERE status = 'running' AND updated_at < ? AND attempts >= ?",
+                    (now, now - JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS),
+                )
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE (status = 'queued' AND run_after <= ?) OR (status = 'running' AND updated_at < ? AND attempts < ?) ORDER BY created_at LIMIT 1",
+                    (now, now - JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS),
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', step = 'started', attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (now, row["id"]),
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+        job = self._to_dict(row)
+        job["attempts"] += 1
+        job["status"] = "running"
+        return job
+
+    def update_step(self, job_id: str, step: str):
+        """Records progress; also acts as the worker's heartbeat for the lease."""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET step = ?, updated_at = ? WHERE id = ?", (step, time.time(), job_id))
+
+    def complete(self, job_id: str, timings: dict | None = None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'completed', step = 'done', error = NULL, timings = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(timings) if timings else None, time.time(), job_id),
+            )
+
+    def fail(self, job_id: str, error: str, attempts: int):
+        """
+        Re-queues the job for another attempt after an exponential backoff (so a provider outage
+        doesn't use up every attempt at once), or marks it failed once attempts are exhausted.
+        """
+        status = "failed" if attempts >= JOB_MAX_ATTEMPTS else "queued"
+        now = time.time()
+        run_after = now + retry_delay(attempts) if status == "queued" else now
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, run_after = ?, updated_at = ? WHERE id = ?",
+                (status, error, run_after, now, job_id),
+            )
+        return status
+
+    def get(self, job_id: str):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def counts(self):
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    @staticmethod
+    def _to_dict(row):
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["timings"] = json.loads(job["timings"]) if job.get("timings") else None
+        return job
@@ -0,0 +1,145 @@
+# backend/knowledge_base.py
+
+import os
+import re
+import math
+import threading
+from collections import Counter
+
+KNOWLEDGE_FILE = os.path.join(os.path.dirname(__file__), "company_info.txt")
+CHUNK_MAX_WORDS = 80
+DEFAULT_TOP_K = int(os.getenv("KB_TOP_K", "3"))
+
+# BM25 tuning constants (standard defaults)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how", "i",
+    "in", "is", "it", "me", "my", "of", "on", "or", "our", "so", "that", "the", "this", "to", "we",
+    "what", "when", "where", "which", "who", "with", "you", "your",
+}
+
+SUFFIXES = ("ations", "ation", "ings", "ing", "ions", "ion", "ed", "es", "s")
+
+def stem(token: str):
+    """Very light suffix stripping so 'located'/'location' and 'price'/'pricing' share a term."""
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            token = token[:-len(suffix)]
+            break
+    if token.endswith("e") and len(token) > 4:
+        token = token[:-1]
+    return token
+
+def tokenize(text: str):
+    return [stem(t) for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS]
+
+def chunk_text(text: str, max_words: int = CHUNK_MAX_WORDS):
+    """
+    Splits the knowledge file into blank-line separated sections. A leading **Heading:** line
+    is repeated on every chunk of its section so each chunk stays self-describing.
+    """
+    chunks = []
+    for section in re.split(r"\n\s*\n", text):
+        lines = [l.strip() for l in section.strip().splitlines() if l.strip()]
+        if not lines:
+            continue
+        heading = lines[0] if lines[0].startswith("**") else ""
+        body = lines[1:] if heading else lines
+        if not body:
+            chunks.append(heading)
+            continue
+
+        current, current_words = [], 0
+        for line in body:
+            words = len(line.split())
+            if current and current_words + words > max_words:
+                chunks.append("\n".join(([heading] if heading else []) + current))
+                current, current_words = [], 0
+            current.append(line)
+            current_words += words
+        chunks.append("\n".join(([heading] if heading else []) + current))
+    return chunks
+
+
+class _Index:
+    """Immutable BM25 index over one snapshot of the knowledge file."""
+    def __init__(self, chunks, mtime):
+        self.chunks = chunks
+        self.mtime = mtime
+        self.term_freqs = [Counter(tokenize(c)) for c in chunks]
+        self.lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+        doc_freq = Counter()
+        for tf in self.term_freqs:
+            doc_freq.update(tf.keys())
+        n = len(chunks)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def search(self, query: str, k: int):
+        terms = [t for t in tokenize(query) if t in self.idf]
+        if not terms:
+            return []
+        scores = []
+        for i, tf in enumerate(self.term_freqs):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[i] / (self.avg_length or 1))
+            score = 0.0
+            for term in terms:
+                f = tf.get(term)
+                if f:
+                    score += self.idf[term] * f * (BM25_K1 + 1) / (f + norm)
+            if score > 0:
+                scores.append((score, i))
+        scores.sort(key=lambda s: (-s[0], s[1]))
+        return [self.chunks[i] for _, i in scores[:k]]
+
+
+class KnowledgeBase:
+    """
+    In-memory lexical index over company_info.txt. The file is chunked and indexed once and only
+    re-read when its mtime changes, so each query costs a stat() plus a BM25 scan of the chunks.
+    """
+    def __init__(self, path: str = KNOWLEDGE_FILE):
+        self.path = path
+        self._index = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Builds (or rebuilds) the index. Raises FileNotFoundError if the file is missing."""
+        mtime = os.path.getmtime(self.path)
+        with open(self.path, "r", encoding="utf-8") as f:
+            chunks = chunk_text(f.read())
+        self._index = _Index(chunks, mtime)
+        print(f"Knowledge base indexed: {len(chunks)} chunks from '{os.path.basename(self.path)}'.")
+        return self._index
+
+    def _current(self):
+        mtime = os.path.getmtime(self.path)
+        index = self._index
+        if index is None or index.mtime != mtime:
+            with self._lock:
+                index = self._index
+                if index is None or index.mtime != mtime:
+                    index = self.load()
+        return index
+
+    @property
+    def version(self):
+        """The mtime of the indexed snapshot; changes whenever the file is re-indexed."""
+        return self._current().mtime
+
+    def retrieve(self, query: str, k: int = DEFAULT_TOP_K):
+        """Returns the top-k chunks for the query, falling back to the company overview chunk."""
+        index = self._current()
+        results = index.search(query, k)
+        if not results and index.chunks:
+            results = index.chunks[:1]
+        return results
+
+    def full_text(self):
+        return "\n\n".join(self._current().chunks)
+
+
+knowledge_base = KnowledgeBase()
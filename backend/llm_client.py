@@ -0,0 +1,132 @@
+# backend/llm_client.py
+
+import os
+import json
+import asyncio
+
+from llm_scheduler import llm_scheduler, estimate_tokens, INTERACTIVE
+
+# IMPORTANT: Ensure GROQ_API_KEY is set in your environment or .env file
+
+# --- Configuration ---
+LLM_MODEL = "llama-3.1-8b-instant"
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "50"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+
+_client = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls: the first caller starts the work, later callers with the
+    same key await the same task and share its result (or exception).
+    """
+    def __init__(self):
+        self._in_flight = {}
+        self._counters = {}
+
+    async def do(self, name: str, key: str, coro_factory):
+        counters = self._counters.setdefault(name, {"calls": 0, "coalesced": 0})
+        counters["calls"] += 1
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            counters["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(coro_factory())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # shield() so one caller disconnecting doesn't cancel the call the others are waiting on
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {
+            "in_flight": len(self._in_flight),
+            "functions": {name: dict(c) for name, c in self._counters.items()},
+        }
+
+
+single_flight = SingleFlight()
+
+def get_client():
+    """
+    Returns the process-wide AsyncGroq client, creating it on first use.
+    The client wraps one pooled httpx.AsyncClient so every call reuses warm connections.
+    """
+    global _client
+    if _client is None:
+        # Imported on first use: groq + httpx are a large share of cold-start import time.
+        import httpx
+        from groq import AsyncGroq
+
+        api_key = os.environ.get("GROQ_API_KEY")
+        if not api_key:
+            raise ValueError("GROQ_API_KEY environment variable is not set.")
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS, max_keepalive_connections=LLM_MAX_KEEPALIVE),
+            timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=5.0),
+        )
+        _client = AsyncGroq(api_key=api_key, http_client=http_client, max_retries=LLM_MAX_RETRIES)
+    return _client
+
+def set_client(client):
+    """Replaces the shared client (used by the load test to plug in a fake LLM)."""
+    global _client
+    _client = client
+
+async def close_client():
+    """Closes the pooled HTTP client. Called on application shutdown."""
+    global _client
+    if _client is not None:
+        try:
+            await _client.close()
+        except Exception as e:
+            print(f"Error while closing LLM client: {e}")
+        _client = None
+
+async def _create(messages: list, temperature: float, response_format: dict | None, timeout: float | None, priority: str):
+    kwargs = {}
+    if response_format:
+        kwargs["response_format"] = response_format
+
+    async with llm_scheduler.slot(priority, estimate_tokens(messages)) as ticket:
+        chat_completion = await get_client().chat.completions.create(
+            messages=messages,
+            model=LLM_MODEL,
+            temperature=temperature,
+            timeout=timeout or LLM_TIMEOUT_SECONDS,
+            **kwargs
+        )
+        usage = getattr(chat_completion, "usage", None)
+        ticket.tokens_used = getattr(usage, "total_tokens", None)
+    return chat_completion.choices[0].message.content
+
+async def complete(messages: list, temperature: float, response_format: dict | None = None, timeout: float | None = None, caller: str = "default", priority: str = INTERACTIVE):
+    """
+    Runs one chat completion without blocking the event loop and returns the message text.
+    Concurrent calls with an identical prompt and parameters share a single upstream request;
+    `caller` names the bucket the coalescing counters are reported under. `priority`
+    ('interactive' or 'background') is the llm_scheduler class the call queues in.
+    """
+    key = json.dumps([LLM_MODEL, messages, temperature, response_format], sort_keys=True)
+    return await single_flight.do(caller, key, lambda: _create(messages, temperature, response_format, timeout, priority))
+
+async def stream_complete(messages: list, temperature: float, timeout: float | None = None, priority: str = INTERACTIVE):
+    """
+    Streams a chat completion, yielding text deltas as the model produces them.
+    Streams are per-caller, so they bypass single-flight coalescing; the scheduler slot is
+    held until the stream ends.
+    """
+    async with llm_scheduler.slot(priority, estimate_tokens(messages)):
+        stream = await get_client().chat.completions.create(
+            messages=messages,
+            model=LLM_MODEL,
+            temperature=temperature,
+            timeout=timeout or LLM_TIMEOUT_SECONDS,
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
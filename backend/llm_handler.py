@@ -1,53 +1,79 @@
 import os
 import json
-from groq import Groq
-import re
+from llm_client import complete, stream_complete
+from llm_scheduler import BACKGROUND
+from knowledge_base import knowledge_base
+from cache import TTLCache, normalize_text
 
 # IMPORTANT: Ensure GROQ_API_KEY is set in your environment or .env file
 
-def get_general_response(user_query: str):
-    """
-    Uses RAG to answer general questions based on the company_info.txt file.
+# Answers to repeated general questions ("what services do you offer", "pricing", ...).
+# Cleared whenever company_info.txt is re-indexed so answers never outlive their source.
+general_answer_cache = TTLCache(
+    max_size=int(os.getenv("ANSWER_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600")),
+)
+_general_cache_version = None
+
+GENERAL_SYSTEM_PROMPT = "You are a professional assistant for Vingsfire. Answer questions directly based on the provided text and your instructions. Understand user intent."
+
+def build_general_messages(user_query: str, company_context: str):
+    """Builds the chat messages for a general question over the given context."""
+    prompt = f"""
+    You are a helpful and professional assistant for a company called Vingsfire.
+    Your goal is to answer the user's questions based ONLY on the provided company information.
+
+    --- Company Information Context ---
+    {company_context}
+    --- End of Context ---
+
+    User's Question: "{user_query}"
+
+    **Instructions:**
+    1.  Your tone must be professional, helpful, and direct. Do not narrate your thought process (e.g., avoid saying "To answer your question..." or "I found that...").
+    
+    2.  **Handle Specific Questions:** If the question is specific (e.g., "What services do you offer?"), find the answer within the "Company Information Context" and formulate a clear, professional response.
+    
+    3.  **Handle Vague Questions:** If the question is vague (e.g., "details", "more", "help"), ask for clarification. For example: "I can certainly provide more details. Are you interested in our services, the proposal process, or something else?"
+    
+    4.  **If Information is Missing:** If the answer is NOT in the context, you MUST respond with: "I'm sorry, I don't have that specific information, but I can connect you with a member of our team for more details."
     """
-    try:
-        api_key = os.environ.get("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set.")
-            
-        with open("company_info.txt", "r", encoding="utf-8") as f:
-            company_context = f.read()
 
-        client = Groq(api_key=api_key)
+    return [
+        {"role": "system", "content": GENERAL_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
 
-        prompt = f"""
-        You are a helpful and professional assistant for a company called Vingsfire.
-        Your goal is to answer the user's questions based ONLY on the provided company information.
+def _lookup_general_answer(user_query: str):
+    """Returns (cache_key, cached_answer_or_None), clearing the cache if the knowledge base changed."""
+    global _general_cache_version
+    if knowledge_base.version != _general_cache_version:
+        general_answer_cache.clear()
+        _general_cache_version = knowledge_base.version
 
-        --- Company Information Context ---
-        {company_context}
-        --- End of Context ---
+    cache_key = normalize_text(user_query)
+    return cache_key, general_answer_cache.get(cache_key)
 
-        User's Question: "{user_query}"
+async def get_general_response(user_query: str):
+    """
+    Uses RAG to answer general questions: only the top-k chunks of company_info.txt
+    retrieved by the knowledge base index are sent to the model.
+    """
+    try:
+        cache_key, cached = _lookup_general_answer(user_query)
+        if cached is not None:
+            return cached
 
-        **Instructions:**
-        1.  Your tone must be professional, helpful, and direct. Do not narrate your thought process (e.g., avoid saying "To answer your question..." or "I found that...").
-        
-        2.  **Handle Specific Questions:** If the question is specific (e.g., "What services do you offer?"), find the answer within the "Company Information Context" and formulate a clear, professional response.
-        
-        3.  **Handle Vague Questions:** If the question is vague (e.g., "details", "more", "help"), ask for clarification. For example: "I can certainly provide more details. Are you interested in our services, the proposal process, or something else?"
-        
-        4.  **If Information is Missing:** If the answer is NOT in the context, you MUST respond with: "I'm sorry, I don't have that specific information, but I can connect you with a member of our team for more details."
-        """
+        company_context = "\n\n".join(knowledge_base.retrieve(user_query))
 
-        chat_completion = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a professional assistant for Vingsfire. Answer questions directly based on the provided text and your instructions. Understand user intent."},
-                {"role": "user", "content": prompt}
-            ],
-            model="llama-3.1-8b-instant",
+        answer = await complete(
+            messages=build_general_messages(user_query, company_context),
             temperature=0.2,
+            caller="get_general_response",
         )
-        return chat_completion.choices[0].message.content
+        if answer:
+            general_answer_cache.set(cache_key, answer)
+        return answer
 
     except FileNotFoundError:
         print("ERROR: company_info.txt not found.")
@@ -56,16 +82,38 @@ def get_general_response(user_query: str):
         print(f"An error occurred with the LLM during general query: {e}")
         return "I'm sorry, I'm having trouble connecting to my knowledge base right now."
 
+async def stream_general_response(user_query: str):
+    """
+    Streaming variant of get_general_response: yields the answer in pieces as the model
+    produces them. Cached answers are yielded in one piece; completed answers are cached.
+    """
+    try:
+        cache_key, cached = _lookup_general_answer(user_query)
+        if cached is not None:
+            yield cached
+            return
+
+        company_context = "\n\n".join(knowledge_base.retrieve(user_query))
+
+        pieces = []
+        async for piece in stream_complete(messages=build_general_messages(user_query, company_context), temperature=0.2):
+            pieces.append(piece)
+            yield piece
+        if pieces:
+            general_answer_cache.set(cache_key, "".join(pieces))
 
-def generate_descriptive_text(category_data, custom_category_name=None):
+    except FileNotFoundError:
+        print("ERROR: company_info.txt not found.")
+        yield "I'm sorry, my knowledge base file seems to be missing."
+    except Exception as e:
+        print(f"An error occurred with the LLM during streamed general query: {e}")
+        yield "I'm sorry, I'm having trouble connecting to my knowledge base right now."
+
+
+async def generate_descriptive_text(category_data, custom_category_name=None):
     category_name = custom_category_name if custom_category_name else category_data.get('category', 'this project')
     
     try:
-        api_key = os.environ.get("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set.")
-        client = Groq(api_key=api_key)
-        
         prompt = f"""
         You are a professional business proposal writer for a tech company, Infinte Tech.
         Your task is to generate professional, human-like text for a proposal.
@@ -89,34 +137,31 @@ def generate_descriptive_text(category_data, custom_category_name=None):
           ]
         }}
         """
-        chat_completion = client.chat.completions.create(
+        response_text = await complete(
             messages=[
                 {"role": "system", "content": "You are a writing assistant that only responds in the required JSON format."},
                 {"role": "user", "content": prompt}
             ],
-            model="llama-3.1-8b-instant",
             temperature=0.6,
             response_format={"type": "json_object"},
+            caller="generate_descriptive_text",
+            priority=BACKGROUND,
         )
-        return json.loads(chat_completion.choices[0].message.content)
+        return json.loads(response_text)
 
     except Exception as e:
         print(f"An error occurred with the LLM during text generation: {e}")
         return None
 
-def estimate_custom_service_cost(service_name: str, main_service: str, examples: list):
+async def estimate_custom_service_cost(service_name: str, main_service: str, examples: list):
     """
     Uses a powerful few-shot prompt to make the AI estimate costs for a custom service.
+    `examples` are catalog rows, most relevant first (see custom_estimator.CustomEstimator).
     """
     try:
-        api_key = os.environ.get("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY environment variable is not set.")
-        client = Groq(api_key=api_key)
-        
         # Create a string of examples for the prompt context
         example_text = ""
-        for ex in examples[:3]: # Use up to 3 relevant examples
+        for ex in examples:
             category = ex.get('category', 'N/A')
             avg_cost = ex.get('avg_cost_inr', 'N/A')
             example_text += f"- Service '{category}' costs around INR {avg_cost}.\n"
@@ -155,18 +200,17 @@ You MUST provide a cost breakdown, even if it is a rough estimate. DO NOT state
     "avg_cost_inr": 0
 }}
 """
-        chat_completion = client.chat.completions.create(
+        response_text = await complete(
             messages=[
                 {"role": "system", "content": "You are a cost estimation assistant that only responds in the required JSON format with integer values for costs."},
                 {"role": "user", "content": prompt}
             ],
-            model="llama-3.1-8b-instant",
             temperature=0.5,
             response_format={"type": "json_object"},
+            caller="estimate_custom_service_cost",
+            priority=BACKGROUND,
         )
         
-        response_text = chat_completion.choices[0].message.content
-        
         # Robustly parse the JSON to prevent errors
         try:
             estimated_data = json.loads(response_text)
@@ -0,0 +1,201 @@
+# backend/llm_scheduler.py
+#
+# Admission control for outbound LLM calls. Every call takes a slot here first, so a burst of
+# background proposal work can neither use up the provider's rate limit nor hold every connection
+# while a chat user waits.
+
+import os
+import time
+import heapq
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+
+# --- Configuration ---
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "32"))
+# Slots background calls may never take, so an interactive call never waits for a whole proposal batch.
+LLM_INTERACTIVE_RESERVED = int(os.getenv("LLM_INTERACTIVE_RESERVED", "8"))
+# Provider limits for the whole deployment; 0 turns a bucket off.
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "600"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+# Share of those limits that belongs to the proposal worker processes (split between them).
+LLM_BACKGROUND_SHARE = float(os.getenv("LLM_BACKGROUND_SHARE", "0.3"))
+# Completion tokens charged up front; corrected once the response reports its usage.
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", "400"))
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+PRIORITIES = {INTERACTIVE: 0, BACKGROUND: 1}  # lower runs first
+
+def estimate_tokens(messages):
+    """Rough prompt + completion size (~4 characters per token), for the token bucket."""
+    return sum(len(str(m.get("content") or "")) for m in messages) // 4 + LLM_COMPLETION_TOKEN_ESTIMATE
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute`, holding at most one minute's worth."""
+    def __init__(self, per_minute):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    def wait_for(self, amount):
+        """Seconds until `amount` can be taken (0 if it can be taken now). Disabled buckets never wait."""
+        if self.per_minute <= 0:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)  # a request larger than the bucket still gets through, alone
+        return 0.0 if self.level >= amount else (amount - self.level) * 60 / self.per_minute
+
+    def take(self, amount):
+        if self.per_minute > 0:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount):
+        """Corrects an up-front estimate (negative when the call used more than charged)."""
+        if self.per_minute > 0:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+
+class Ticket:
+    """One admitted call. Set `tokens_used` before leaving the slot to settle the token estimate."""
+    __slots__ = ("priority", "tokens", "tokens_used")
+
+    def __init__(self, priority, tokens):
+        self.priority = priority
+        self.tokens = tokens
+        self.tokens_used = None
+
+
+class LLMScheduler:
+    """
+    Priority queue in front of the LLM provider. A call is admitted when a slot is free (background
+    calls leave LLM_INTERACTIVE_RESERVED slots alone) and both token buckets (requests and LLM
+    tokens per minute) allow it; waiting calls are admitted strictly by priority, then arrival.
+
+    Per process: the web process and each proposal worker run their own scheduler, so scale()
+    hands each its share of the deployment's rate limits.
+    """
+    def __init__(self, max_in_flight=LLM_MAX_IN_FLIGHT, reserved=LLM_INTERACTIVE_RESERVED,
+                 requests_per_minute=LLM_REQUESTS_PER_MINUTE, tokens_per_minute=LLM_TOKENS_PER_MINUTE):
+        self.max_in_flight = max(1, max_in_flight)
+        self.reserved = min(max(0, reserved), self.max_in_flight - 1)
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._heap = []  # (rank, seq, future, ticket)
+        self._seq = 0
+        self._timer = None
+        self._in_flight = {name: 0 for name in PRIORITIES}
+        self._waiting = {name: 0 for name in PRIORITIES}
+        self._counters = {name: {"admitted": 0, "queued": 0, "rate_limited": 0, "max_queue_depth": 0} for name in PRIORITIES}
+        self._waits = {name: deque(maxlen=1000) for name in PRIORITIES}  # recent queue waits, ms
+
+    def scale(self, share):
+        """Keeps `share` of the configured rate limits for this process."""
+        for bucket, per_minute in ((self.requests, LLM_REQUESTS_PER_MINUTE), (self.tokens, LLM_TOKENS_PER_MINUTE)):
+            bucket.per_minute = bucket.capacity = per_minute * share
+            bucket.level = min(bucket.level, bucket.capacity)
+
+    def _has_slot(self, priority):
+        limit = self.max_in_flight if priority == INTERACTIVE else self.max_in_flight - self.reserved
+        return sum(self._in_flight.values()) < limit
+
+    def _admit(self, ticket):
+        self.requests.take(1)
+        self.tokens.take(ticket.tokens)
+        self._in_flight[ticket.priority] += 1
+        self._counters[ticket.priority]["admitted"] += 1
+
+    def _dispatch(self):
+        """Admits waiting calls in order until the head of the queue has to wait."""
+        self._timer = None
+        while self._heap:
+            _, _, future, ticket = self._heap[0]
+            if future.cancelled():
+                heapq.heappop(self._heap)
+                continue
+            # Strict order: when the head has to wait, so does everything behind it (interactive calls sort first).
+            if not self._has_slot(ticket.priority):
+                return
+            delay = max(self.requests.wait_for(1), self.tokens.wait_for(ticket.tokens))
+            if delay > 0:
+                self._counters[ticket.priority]["rate_limited"] += 1
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._heap)
+            self._admit(ticket)
+            future.set_result(ticket)
+
+    def _release(self, ticket):
+        self._in_flight[ticket.priority] -= 1
+        if ticket.tokens_used is not None:
+            self.tokens.give_back(ticket.tokens - ticket.tokens_used)
+        if self._heap and self._timer is None:
+            self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority=INTERACTIVE, tokens=0):
+        """Waits for permission to make one LLM call; the slot is held until the block exits."""
+        priority = priority if priority in PRIORITIES else INTERACTIVE
+        ticket = Ticket(priority, tokens)
+        start = time.perf_counter()
+        counters = self._counters[priority]
+        # Straight through unless a call of the same or a higher priority is already waiting.
+        ready = (not self._heap or self._heap[0][0] > PRIORITIES[priority]) and self._has_slot(priority) and \
+            self.requests.wait_for(1) == 0 and self.tokens.wait_for(tokens) == 0
+        if ready:
+            self._admit(ticket)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._seq += 1
+            heapq.heappush(self._heap, (PRIORITIES[priority], self._seq, future, ticket))
+            counters["queued"] += 1
+            self._waiting[priority] += 1
+            counters["max_queue_depth"] = max(counters["max_queue_depth"], self._waiting[priority])
+            try:
+                if self._timer is None:
+                    self._dispatch()
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    self._release(ticket)  # admitted just as the caller went away
+                raise
+            finally:
+                self._waiting[priority] -= 1
+        self._waits[priority].append((time.perf_counter() - start) * 1000)
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    def stats(self):
+        def percentile(values, q):
+            return round(sorted(values)[int(q * (len(values) - 1))], 1) if values else 0.0
+        return {
+            "max_in_flight": self.max_in_flight,
+            "interactive_reserved": self.reserved,
+            "requests_per_minute": self.requests.per_minute,
+            "tokens_per_minute": self.tokens.per_minute,
+            "priorities": {
+                name: {
+                    **self._counters[name],
+                    "in_flight": self._in_flight[name],
+                    "queue_depth": self._waiting[name],
+                    "wait_ms_p50": percentile(self._waits[name], 0.5),
+                    "wait_ms_p95": percentile(self._waits[name], 0.95),
+                    "wait_ms_max": round(max(self._waits[name], default=0.0), 1),
+                }
+                for name in PRIORITIES
+            },
+        }
+
+
+llm_scheduler = LLMScheduler()
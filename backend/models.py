@@ -0,0 +1,47 @@
+# backend/models.py
+
+from pydantic import BaseModel
+from typing import Dict, Any, List, Literal
+
+# Stateless mode: the client sends `stage` + the full `user_details` and gets them back every turn.
+# Session mode: the client sends only `session_id` (from POST /session) + `user_input`; the state
+# stays on the server and the reply is a SessionChatResponse carrying just the changed fields.
+class ChatRequest(BaseModel):
+    stage: str | None = None
+    user_details: Dict[str, Any] = {}
+    user_input: str | None = None
+    session_id: str | None = None
+
+class ChatResponse(BaseModel):
+    next_stage: str
+    bot_message: str
+    user_details: Dict[str, Any]
+    ui_elements: Dict[str, Any] | None = None
+
+class SessionChatResponse(BaseModel):
+    session_id: str
+    next_stage: str
+    bot_message: str
+    changed: Dict[str, Any]
+    removed: List[str] = []
+    ui_elements: Dict[str, Any] | None = None
+
+class ProposalRequest(BaseModel):
+    user_details: Dict[str, Any] = {}
+    session_id: str | None = None
+    category: str
+    custom_category_name: str | None = None
+    custom_category_data: Dict[str, Any] | None = None
+
+# One entry per catalog selection; leaving sub_category/category out selects everything under it.
+class QuoteItem(BaseModel):
+    main_service: str
+    sub_category: str | None = None
+    category: str | None = None
+
+class QuoteBatchRequest(BaseModel):
+    items: List[QuoteItem]
+    countries: List[str]
+    company_sizes: List[str] | None = None  # defaults to the company-size dropdown
+    format: Literal["jsonl", "csv"] = "jsonl"
+    catalog_version: str | None = None
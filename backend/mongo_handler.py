@@ -1,6 +1,5 @@
 import os
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure, ConfigurationError
+import asyncio
 from dotenv import load_dotenv
 import certifi
 from datetime import datetime
@@ -8,83 +7,293 @@ from datetime import datetime
 load_dotenv()
 
 # Renamed variable for clarity, though not strictly necessary
-MONGO_URI = os.getenv("MONGO_URI") 
+# MONGO_URI="mongomock://" runs against an in-memory mongomock_motor stand-in (local testing only;
+# it needs requirements-dev.txt, which pins a pymongo that mongomock supports).
+MONGO_URI = os.getenv("MONGO_URI")
 DATABASE_NAME = "vingsfire_leads"
 COLLECTION_NAME = "proposals"
 
+# --- POOL & TIMEOUTS ---
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "20"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "2"))
+MONGO_MAX_IDLE_MS = int(os.getenv("MONGO_MAX_IDLE_MS", "300000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "10000"))
+
+# --- WRITE-BEHIND ---
+LEAD_FLUSH_INTERVAL_MS = int(os.getenv("LEAD_FLUSH_INTERVAL_MS", "200"))
+LEAD_FLUSH_MAX_OPS = int(os.getenv("LEAD_FLUSH_MAX_OPS", "100"))
+# Per-update error codes worth another attempt (stepdown, shutdown, network, write conflict, or an
+# upsert that raced another process's insert of the same email). Any other write error is permanent.
+LEAD_RETRYABLE_WRITE_CODES = {6, 7, 89, 91, 112, 189, 262, 9001, 10107, 11000, 11600, 11602, 13435, 13436}
+
 client = None
 collection = None
 
-try:
-    if not MONGO_URI:
-        raise ConfigurationError("MONGO_URI environment variable is not set.")
-    
+def create_client(uri: str):
+    if uri.startswith("mongomock://"):
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError as e:
+            raise RuntimeError("MONGO_URI=mongomock:// needs the dev requirements: pip install -r requirements-dev.txt") from e
+        return AsyncMongoMockClient()
+
+    from motor.motor_asyncio import AsyncIOMotorClient
     # Use certifi to provide SSL certificate
-    ca = certifi.where()
-    client = MongoClient(MONGO_URI, tlsCAFile=ca)
-    
-    # The ping command is a lightweight way to verify the connection.
-    client.admin.command('ping')
-    print("✅ MongoDB connection successful.")
-    db = client[DATABASE_NAME]
-    collection = db[COLLECTION_NAME]
-
-except (ConnectionFailure, ConfigurationError) as e:
-    print(f"FATAL: Could not connect to MongoDB: {e}")
-except Exception as e:
-    print(f"An unexpected error occurred during MongoDB setup: {e}")
-
-def save_lead(lead_data: dict):
+    return AsyncIOMotorClient(
+        uri,
+        tlsCAFile=certifi.where(),
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGO_MAX_IDLE_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        retryWrites=True,
+    )
+
+class LeadWriteBuffer:
+    """
+    Write-behind buffer for lead updates. Pending `$set`s are merged per email (later fields win)
+    and written as one unordered bulk_write every LEAD_FLUSH_INTERVAL_MS, or as soon as
+    LEAD_FLUSH_MAX_OPS emails are pending. A failed flush puts its updates back for the next one;
+    an update MongoDB rejects outright (e.g. an invalid field name) is logged and dropped, so it
+    can't hold back the rest of the batch.
+    """
+    def __init__(self, interval_ms: int = LEAD_FLUSH_INTERVAL_MS, max_ops: int = LEAD_FLUSH_MAX_OPS):
+        self.interval = interval_ms / 1000
+        self.max_ops = max_ops
+        self._pending = {}  # email -> {"fields": {...}, "upsert": bool}
+        self._task = None
+        self._stopping = False
+        self._wake = None
+        self._flush_lock = None
+        self.buffered = 0
+        self.flushes = 0
+        self.written = 0
+        self.errors = 0
+        self.dropped = 0
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if self.running:
+            return
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stops the timer and writes everything still pending."""
+        if self._task is not None:
+            # Wake the loop rather than cancel it: wait_for() can swallow a cancellation that
+            # races with the wake-up, which would leave stop() waiting forever.
+            self._stopping = True
+            self._wake.set()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self._pending:
+            print(f"ERROR: {len(self._pending)} lead update(s) could not be written before shutdown.")
+
+    def add(self, email: str, fields: dict, upsert: bool):
+        entry = self._pending.setdefault(email, {"fields": {}, "upsert": False})
+        entry["fields"].update(fields)
+        entry["upsert"] = entry["upsert"] or upsert
+        self.buffered += 1
+        if len(self._pending) >= self.max_ops:
+            self._wake.set()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending or collection is None:
+            return
+        async with self._flush_lock:
+            batch, self._pending = self._pending, {}
+            if not batch:
+                return
+            emails = list(batch)
+            try:
+                retry = await self._write(emails, batch)
+                self.flushes += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"Error flushing {len(emails)} lead update(s) to MongoDB, will retry: {e}")
+                retry = emails
+            # Re-queue underneath anything that arrived during the failed write.
+            for email in retry:
+                entry = batch[email]
+                newer = self._pending.get(email)
+                if newer is not None:
+                    entry["fields"].update(newer["fields"])
+                    entry["upsert"] = entry["upsert"] or newer["upsert"]
+                self._pending[email] = entry
+
+    async def _write(self, emails, batch):
+        """
+        One unordered bulk_write of the updates for `emails`. Returns the emails to retry; raises
+        when the whole write failed (connection lost, no primary, ...).
+        """
+        from bson.errors import BSONError
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+        operations = [
+            UpdateOne({"email": email}, {"$set": batch[email]["fields"]}, upsert=batch[email]["upsert"])
+            for email in emails
+        ]
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Unordered: every update not listed in writeErrors was applied.
+            retry = []
+            write_errors = e.details.get("writeErrors", [])
+            for error in write_errors:
+                email = emails[error["index"]]
+                if error.get("code") in LEAD_RETRYABLE_WRITE_CODES:
+                    retry.append(email)
+                else:
+                    self._drop(email, error.get("errmsg", error))
+            self.errors += 1
+            self.written += len(operations) - len(write_errors)
+            return retry
+        except BSONError as e:
+            # Rejected without saying which update (e.g. a value BSON can't encode): isolate it.
+            self.errors += 1
+            if len(emails) == 1:
+                self._drop(emails[0], e)
+                return []
+            retry = []
+            for email in emails:
+                retry += await self._write([email], batch)
+            return retry
+        self.written += len(operations)
+        return []
+
+    def _drop(self, email, reason):
+        self.dropped += 1
+        print(f"ERROR: Dropping lead update for {email}, MongoDB rejected it: {reason}")
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "buffered_updates": self.buffered,
+            "flushes": self.flushes,
+            "documents_written": self.written,
+            "errors": self.errors,
+            "dropped": self.dropped,
+        }
+
+
+lead_buffer = LeadWriteBuffer()
+
+async def _write_lead(email: str, fields: dict, upsert: bool):
+    """Queues the update on the write-behind buffer, or writes it directly if the buffer isn't running."""
+    if lead_buffer.running:
+        lead_buffer.add(email, fields, upsert)
+        return None
+    return await collection.update_one({"email": email}, {"$set": fields}, upsert=upsert)
+
+async def init_db(mongo_client=None):
+    """
+    Connects (or adopts `mongo_client`, e.g. an AsyncMongoMockClient) and ensures the unique
+    index on `email` that every lead lookup filters on. Must run inside the event loop that
+    will use the client. Returns True when the database is ready.
+
+    The write-behind buffer starts first, so leads saved while the connection is still being
+    established are kept and flushed once it is up (or reported as lost if it fails).
+    """
+    global client, collection
+    if mongo_client is None and not MONGO_URI:
+        print("FATAL: Could not connect to MongoDB: MONGO_URI environment variable is not set.")
+        return False
+
+    from pymongo.errors import PyMongoError
+    lead_buffer.start()
+    try:
+        if mongo_client is None:
+            mongo_client = create_client(MONGO_URI)
+
+        # The ping command is a lightweight way to verify the connection.
+        await mongo_client.admin.command('ping')
+        client = mongo_client
+        collection = client[DATABASE_NAME][COLLECTION_NAME]
+        print("✅ MongoDB connection successful.")
+    except Exception as e:
+        print(f"FATAL: Could not connect to MongoDB: {e}")
+        await lead_buffer.stop()
+        return False
+
+    try:
+        await collection.create_index("email", unique=True, name="email_unique")
+    except PyMongoError as e:
+        # Usually pre-existing duplicate emails; the app still works, just without the index.
+        print(f"WARNING: Could not create unique index on 'email': {e}")
+    return True
+
+async def close_db():
+    """Flushes buffered lead writes, then closes the client."""
+    global client, collection
+    await lead_buffer.stop()
+    if client is not None:
+        client.close()
+    client = None
+    collection = None
+
+def _available():
+    return collection is not None or lead_buffer.running
+
+async def save_lead(lead_data: dict):
     """Saves the initial lead document after phone number submission."""
-    if collection is None:
+    if not _available():
         print("ERROR: Cannot save lead, no database collection available.")
         return False
     try:
         # Use update_one with upsert=True to avoid duplicates if the user restarts
-        collection.update_one(
-            {"email": lead_data["email"]},
-            {"$set": lead_data},
-            upsert=True
-        )
+        await _write_lead(lead_data["email"], dict(lead_data), upsert=True)
         print(f"Successfully saved initial lead for {lead_data['email']}")
         return True
     except Exception as e:
         print(f"Error saving lead to MongoDB: {e}")
         return False
 
-def update_lead_details(email: str, full_details: dict):
+async def update_lead_details(email: str, full_details: dict):
     """Finds a lead by email and updates it with all collected details."""
-    if collection is None:
+    if not _available():
         print("ERROR: Cannot update lead, no database collection available.")
         return False
     try:
-        result = collection.update_one(
-            {"email": email},
-            {"$set": full_details}
-        )
-        if result.modified_count > 0 or result.upserted_id is not None:
+        result = await _write_lead(email, dict(full_details), upsert=False)
+        if result is None or result.modified_count > 0 or result.upserted_id is not None:
             print(f"Successfully updated full details for {email}.")
         return True
     except Exception as e:
         print(f"Error updating lead in MongoDB: {e}")
         return False
-    
-def update_lead_with_resume(email: str, resume_path: str):
+
+async def update_lead_with_resume(email: str, resume_path: str):
     """
     Finds a lead by email and adds or updates their resume file path.
     """
     # Add robust check for database connection
-    if collection is None:
+    if not _available():
         print("ERROR: Cannot update lead with resume, no database collection available.")
         return
-        
+
     try:
-        # --- BUG FIX: Use the correct global variable 'collection' ---
-        collection.update_one(
-            {"email": email},
-            {"$set": {"resume_path": resume_path, "last_updated": datetime.utcnow()}},
-            upsert=False # We don't want to create a new lead if they don't exist
-        )
+        # upsert=False: we don't want to create a new lead if they don't exist
+        await _write_lead(email, {"resume_path": resume_path, "last_updated": datetime.utcnow()}, upsert=False)
         print(f"--- MongoDB: Added resume path '{resume_path}' for lead {email} ---")
     except Exception as e:
-        print(f"--- MongoDB ERROR: Could not update lead with resume path. Error: {e} ---")
\ No newline at end of file
+        print(f"--- MongoDB ERROR: Could not update lead with resume path. Error: {e} ---")
@@ -0,0 +1,72 @@
+# backend/option_registry.py
+
+from types import MappingProxyType
+
+OTHER_REQUIREMENT = "Other Requirement"
+BASE_BUDGETS_INR = [(100000, 400000), (500000, 800000), (800000, 1000000), (1000000, None)]
+DEFAULT_COUNTRY = "India"
+
+def frozen_ui(**ui_elements):
+    """A read-only ui_elements payload; option lists become tuples (they serialize as JSON arrays)."""
+    return MappingProxyType({key: tuple(value) if isinstance(value, list) else value for key, value in ui_elements.items()})
+
+def generate_local_budget_options(country_info):
+    exchange_rate = country_info['exchange_rate_from_inr']
+    symbol = country_info['currency_symbol']
+    options = []
+    for low, high in BASE_BUDGETS_INR:
+        low_local = low * exchange_rate
+        if high:
+            high_local = high * exchange_rate
+            options.append(f"{symbol}{low_local:,.0f} - {symbol}{high_local:,.0f}")
+        else:
+            options.append(f"{symbol}{low_local:,.0f}+")
+    return options
+
+
+class OptionRegistry:
+    """
+    Every option list /chat can show, computed once from the catalog and country data:
+    the phone form, budget buttons per country, service cards and sub-category pills.
+    Build a new registry whenever the catalog or country data changes; never mutate one.
+    """
+    def __init__(self, catalog, countries):
+        self.phone_form = frozen_ui(type="form", form_type="phone", options=list(countries.keys()))
+
+        # country -> (currency_code, budget buttons)
+        self.budgets = MappingProxyType({
+            name: (info['currency_code'], frozen_ui(type="buttons", display_style="pills", options=generate_local_budget_options(info)))
+            for name, info in countries.items()
+        })
+
+        self.main_service_cards = frozen_ui(type="buttons", display_style="cards", options=catalog.main_services)
+        self.app_platform_cards = frozen_ui(type="buttons", display_style="cards", options=list(catalog.app_sub_category_definitions.keys()))
+        self.sub_category_cards = MappingProxyType({
+            main_service: frozen_ui(type="buttons", display_style="cards", options=sub_categories)
+            for main_service, sub_categories in catalog.sub_categories_others.items()
+        })
+        self.service_type_cards = MappingProxyType({
+            main_service: frozen_ui(type="buttons", display_style="cards", options=list(sub_categories.get('_default', {}).keys()) + [OTHER_REQUIREMENT])
+            for main_service, sub_categories in catalog.services_data.items()
+        })
+
+        # (main_service, sub_category) -> pills; App Development uses its platform definitions.
+        refine = {}
+        for main_service, sub_categories in catalog.services_data.items():
+            if main_service == "App Development":
+                continue
+            for sub_category, categories in sub_categories.items():
+                refine[(main_service, sub_category)] = list(categories.keys())
+        for platform, categories in catalog.app_sub_category_definitions.items():
+            refine[("App Development", platform)] = list(categories)
+        self.refine_pills = MappingProxyType({
+            key: frozen_ui(type="buttons", display_style="pills", options=options + [OTHER_REQUIREMENT])
+            for key, options in refine.items()
+        })
+        self.other_only_pills = frozen_ui(type="buttons", display_style="pills", options=[OTHER_REQUIREMENT])
+
+    def budget_for(self, country):
+        return self.budgets.get(country) or self.budgets[DEFAULT_COUNTRY]
+
+    def refine_for(self, main_service, sub_category):
+        return self.refine_pills.get((main_service, sub_category), self.other_only_pills)
@@ -1,7 +1,12 @@
 # pdf_writer.py
 
 from fpdf import FPDF
+from fpdf.fonts import SubsetMap, TTFFont
+from fontTools import ttLib
 import os
+import copy
+import threading
+from io import BytesIO
 from datetime import datetime
 
 COMPANY_EMAIL = "Partha@infinitetechai.com"
@@ -32,6 +37,64 @@ class PDF(FPDF):
         self.cell(0, 8, title, ln=True, fill=True, align="L")
         self.ln(4)
 
+# --- FONT CACHE ---
+# TTFFont's fields as of the fpdf2 version pinned in requirements.txt. Parsed once, then only read:
+SHARED_FONT_FIELDS = frozenset({
+    "type", "name", "desc", "glyph_ids", "sp", "ss", "up", "ut", "ttffile", "fontkey", "emphasis", "scale",
+    "cmap", "color_font", "unicode_range", "palette_index", "is_compressed", "is_cff", "is_cid_keyed",
+    "is_symbol", "cff_ros", "collection_font_number",
+})
+# Written while a document is laid out or output, so every document gets its own:
+PER_DOCUMENT_FONT_FIELDS = frozenset({"i", "ttfont", "_hbfont", "cw", "subset", "missing_glyphs", "biggest_size_pt"})
+
+class FontCache:
+    """
+    Parses each TTF (cmap, widths, descriptor) once per process and builds every new PDF its own
+    TTFFont from the parsed fields. Everything fpdf2 writes to while rendering (the fontTools
+    TTFont it subsets in place, the HarfBuzz face, the glyph subset, the width table) is rebuilt per
+    document, so every document still embeds only the glyphs it uses. A TTFFont field this cache
+    doesn't know (a different fpdf2) disables it, and setup_fonts falls back to add_font.
+    """
+    def __init__(self):
+        self._templates = {}
+        self._font_bytes = {}
+        self._lock = threading.Lock()
+
+    def _template(self, family, style, path):
+        key = (family, style, path)
+        template = self._templates.get(key)
+        if template is None:
+            unknown = set(TTFFont.__slots__) - SHARED_FONT_FIELDS - PER_DOCUMENT_FONT_FIELDS
+            if unknown:
+                raise RuntimeError(f"unknown TTFFont fields {sorted(unknown)}")
+            with self._lock:
+                template = self._templates.get(key)
+                if template is None:
+                    with open(path, "rb") as f:
+                        self._font_bytes[path] = f.read()
+                    scratch = FPDF()
+                    scratch.add_font(family, style, path)
+                    template = scratch.fonts[f"{family.lower()}{style}"]
+                    self._templates[key] = template
+        return template
+
+    def install(self, pdf_instance, family, style, path):
+        template = self._template(family, style, path)
+        font = TTFFont.__new__(TTFFont)
+        for name in SHARED_FONT_FIELDS:
+            if hasattr(template, name):  # some are only set for some fonts (cff_ros)
+                setattr(font, name, getattr(template, name))
+        font.i = len(pdf_instance.fonts) + 1
+        font.ttfont = ttLib.TTFont(BytesIO(self._font_bytes[path]), recalcTimestamp=False, lazy=True)
+        font._hbfont = None  # built on first shaped text
+        font.cw = copy.copy(template.cw)  # a defaultdict: looking up an unknown character adds it
+        font.missing_glyphs = []
+        font.biggest_size_pt = 0
+        font.subset = SubsetMap(font)
+        pdf_instance.fonts[font.fontkey] = font
+
+font_cache = FontCache()
+
 # Function to setup fonts (reused by both PDF generation functions)
 def setup_fonts(pdf_instance):
     font_path = os.path.join(os.path.dirname(__file__), "fonts") 
@@ -42,12 +105,26 @@ def setup_fonts(pdf_instance):
         pdf_instance.add_font("Arial", "I", "Arial.ttf", uni=True) # Assuming Arial.ttf has italics too
         pdf_instance.set_font("Arial", "B", 12)
     else:
-        pdf_instance.add_font("DejaVu", "", os.path.join(font_path, "DejaVuSans.ttf"), uni=True)
-        pdf_instance.add_font("DejaVu", "B", os.path.join(font_path, "DejaVuSans-Bold.ttf"), uni=True)
-        pdf_instance.add_font("DejaVu", "I", os.path.join(font_path, "DejaVuSans-Oblique.ttf"), uni=True)
+        for style, file_name in (("", "DejaVuSans.ttf"), ("B", "DejaVuSans-Bold.ttf"), ("I", "DejaVuSans-Oblique.ttf")):
+            try:
+                font_cache.install(pdf_instance, "DejaVu", style, os.path.join(font_path, file_name))
+            except Exception as e:
+                # Fall back to a full parse if fpdf2's font internals ever change shape
+                print(f"WARNING: Font cache unavailable for DejaVu '{style}', parsing directly. Error: {e}")
+                pdf_instance.add_font("DejaVu", style, os.path.join(font_path, file_name))
+
 
+def archive_pdf(pdf_bytes, output_path):
+    """Best-effort copy of a rendered PDF to disk; delivery never depends on it."""
+    try:
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(pdf_bytes)
+    except Exception as e:
+        print(f"Error while archiving PDF to '{output_path}': {e}")
 
-def create_proposal_pdf(user_details, proposal_text, proposal_costs, country_info, output_path):
+def create_proposal_pdf(user_details, proposal_text, proposal_costs, country_info, output_path=None):
+    """Renders the client proposal and returns the PDF bytes. `output_path` optionally archives a copy to disk."""
     pdf = PDF()
     pdf.pdf_type = 'client_proposal' # Identify PDF type for header
     setup_fonts(pdf) # Setup fonts
@@ -141,12 +218,17 @@ def create_proposal_pdf(user_details, proposal_text, proposal_costs, country_inf
     pdf.cell(0, 6, f"Phone: {COMPANY_PHONE}", ln=True)
     
     try:
-        pdf.output(output_path)
+        pdf_bytes = bytes(pdf.output())
     except Exception as e:
-        print(f"Error while saving client proposal PDF: {e}")
+        print(f"Error while rendering client proposal PDF: {e}")
+        return None
+    if output_path:
+        archive_pdf(pdf_bytes, output_path)
+    return pdf_bytes
 
 # --- NEW FUNCTION FOR SALES LEAD PDF ---
-def create_sales_lead_pdf(user_details, proposal_costs, output_path):
+def create_sales_lead_pdf(user_details, proposal_costs, output_path=None):
+    """Renders the sales lead summary and returns the PDF bytes. `output_path` optionally archives a copy to disk."""
     pdf = PDF()
     pdf.pdf_type = 'sales_lead'
     setup_fonts(pdf)
@@ -209,6 +291,10 @@ def create_sales_lead_pdf(user_details, proposal_costs, output_path):
     pdf.ln(5)
 
     try:
-        pdf.output(output_path)
+        pdf_bytes = bytes(pdf.output())
     except Exception as e:
-        print(f"Error while saving sales lead PDF: {e}")
\ No newline at end of file
+        print(f"Error while rendering sales lead PDF: {e}")
+        return None
+    if output_path:
+        archive_pdf(pdf_bytes, output_path)
+    return pdf_bytes
\ No newline at end of file
@@ -0,0 +1,115 @@
+# backend/price_matrix.py
+
+from proposal_logic import COST_COMPONENTS, OPTIONAL_ADDONS, DISCOUNT_TIERS, get_discount_for_company_size, safe_float
+
+
+class PriceMatrix:
+    """
+    Every quote prepare_proposal_data() can produce for a catalog row, computed up front:
+    catalog rows x countries x discount tiers, with NumPy doing the arithmetic and the display
+    strings formatted once. quote() is then a dict lookup.
+
+    Part of a Catalog, so a new matrix is built with every catalog version (exchange rates come
+    from country_data, which only changes with a deploy). The elementwise operations run in the
+    same order as prepare_proposal_data(), so the strings are byte-identical to it.
+    """
+    def __init__(self, catalog, countries):
+        import numpy as np
+
+        self._rows = {}
+        columns = [column for _, column in COST_COMPONENTS] + [OPTIONAL_ADDONS[1]]
+        values = []
+        for main_service, sub_categories in catalog.services_data.items():
+            for sub_category, categories in sub_categories.items():
+                for category, category_data in categories.items():
+                    self._rows[(main_service, sub_category, category)] = len(values)
+                    values.append([safe_float(category_data.get(column)) for column in columns])
+
+        self._countries = {name: i for i, name in enumerate(countries)}
+        self._tiers = {rate: i for i, rate in enumerate(DISCOUNT_TIERS)}
+        symbols = [info['currency_symbol'] for info in countries.values()]
+
+        inr = np.array(values, dtype=np.float64).reshape(len(values), len(columns))
+        rates = np.array([info['exchange_rate_from_inr'] for info in countries.values()], dtype=np.float64)
+        tiers = np.array(DISCOUNT_TIERS, dtype=np.float64)
+
+        # Python floats overflow to inf/nan silently; so should the matrix.
+        with np.errstate(all="ignore"):
+            # Same association as sum(components) + add-ons, which starts from 0.
+            subtotal_inr = np.zeros(len(values))
+            for i in range(len(columns)):
+                subtotal_inr = subtotal_inr + inr[:, i]
+
+            line_items_local = inr[:, None, :] * rates[None, :, None]        # rows x countries x line items
+            subtotal_local = subtotal_inr[:, None] * rates[None, :]           # rows x countries
+            discount_local = subtotal_local[:, :, None] * tiers[None, None, :]  # rows x countries x tiers
+            final_total_local = subtotal_local[:, :, None] - discount_local
+
+        def money(symbol, amounts):
+            return [f"{symbol}{amount:,.0f}" for amount in amounts]
+
+        # tolist() hands back Python floats, which format exactly like the scalar path.
+        self._line_items = [
+            [tuple(money(symbols[c], row[c])) for c in range(len(symbols))]
+            for row in line_items_local.tolist()
+        ]
+        self._subtotal = [
+            [money(symbols[c], [amount])[0] for c, amount in enumerate(row)]
+            for row in subtotal_local.tolist()
+        ]
+        self._discount = [
+            [tuple(f"-{s}" for s in money(symbols[c], row[c])) for c in range(len(symbols))]
+            for row in discount_local.tolist()
+        ]
+        self._final_total = [
+            [tuple(money(symbols[c], row[c])) for c in range(len(symbols))]
+            for row in final_total_local.tolist()
+        ]
+        self._discount_rate_str = [f"{rate:.0%}" for rate in DISCOUNT_TIERS]
+        self._items = [name for name, _ in COST_COMPONENTS] + [OPTIONAL_ADDONS[0]]
+
+    def quote(self, main_service, sub_category, category, country, company_size):
+        """prepare_proposal_data() for a catalog row, or None if the row or country isn't in the matrix."""
+        r = self._rows.get((main_service, sub_category, category))
+        c = self._countries.get(country)
+        if r is None or c is None:
+            return None
+        t = self._tiers[get_discount_for_company_size(company_size)]
+        return {
+            "cost_breakdown": [{"item": item, "cost": cost} for item, cost in zip(self._items, self._line_items[r][c])],
+            "subtotal_str": self._subtotal[r][c],
+            "discount_rate_str": self._discount_rate_str[t],
+            "discount_str": self._discount[r][c][t],
+            "final_total_str": self._final_total[r][c][t],
+        }
+
+    def rows_matching(self, main_service, sub_category=None, category=None):
+        """Catalog rows under main_service, optionally narrowed to a sub-category and category (catalog order)."""
+        return [
+            row for row in self._rows
+            if row[0] == main_service and sub_category in (None, row[1]) and category in (None, row[2])
+        ]
+
+    def quote_batch(self, rows, countries, company_sizes):
+        """Yields (row, country, company_size, quote) for every combination, rows outermost."""
+        tiers = [(size, self._tiers[get_discount_for_company_size(size)]) for size in company_sizes]
+        for row in rows:
+            r = self._rows[row]
+            for country in countries:
+                c = self._countries[country]
+                line_items = [{"item": item, "cost": cost} for item, cost in zip(self._items, self._line_items[r][c])]
+                for company_size, t in tiers:
+                    yield row, country, company_size, {
+                        "cost_breakdown": line_items,
+                        "subtotal_str": self._subtotal[r][c],
+                        "discount_rate_str": self._discount_rate_str[t],
+                        "discount_str": self._discount[r][c][t],
+                        "final_total_str": self._final_total[r][c][t],
+                    }
+
+    @property
+    def line_items(self):
+        return list(self._items)
+
+    def stats(self):
+        return {"rows": len(self._rows), "countries": len(self._countries), "discount_tiers": len(self._tiers)}
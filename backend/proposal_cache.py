@@ -0,0 +1,177 @@
+# backend/proposal_cache.py
+
+import os
+import json
+import asyncio
+import hashlib
+import threading
+from llm_handler import generate_descriptive_text
+
+PROPOSAL_CACHE_FILE = os.getenv("PROPOSAL_CACHE_FILE", os.path.join(os.path.dirname(__file__), "proposal_text_cache.json"))
+WARMUP_CONCURRENCY = int(os.getenv("PROPOSAL_WARMUP_CONCURRENCY", "2"))
+WARMUP_SAVE_EVERY = 20  # warm-up writes the file once per this many new entries, not once per entry
+
+try:
+    import fcntl  # serialises the read-merge-write between processes (POSIX only)
+except ImportError:
+    fcntl = None
+
+def proposal_text_key(category_data, category_name=None):
+    """Hash of the only inputs the proposal prompt uses for a catalog row."""
+    name = category_name or category_data.get('category', 'this project')
+    payload = json.dumps([
+        str(name),
+        str(category_data.get('project_overview', '')),
+        str(category_data.get('core_modules', '')),
+    ])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _stamp(path):
+    # os.replace gives the file a new inode, so this changes with every write even within one mtime tick.
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class ProposalTextCache:
+    """
+    Disk-backed map of proposal_text_key -> {"introduction", "scope_of_work"}.
+    The whole map is small (one entry per catalog row), so it is held in memory; set() only
+    changes memory and save() writes it out in a thread, first merging whatever other
+    processes wrote since this one last read the file.
+    """
+    def __init__(self, path: str = PROPOSAL_CACHE_FILE):
+        self.path = path
+        self._data = {}
+        self._stamp = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        """Merges the on-disk entries into memory (other processes may have added some)."""
+        try:
+            self._stamp = _stamp(self.path)
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._data.update(json.load(f))
+            print(f"Loaded {len(self._data)} cached proposal texts.")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"WARNING: Could not read proposal text cache '{self.path}'. Error: {e}")
+
+    def _refresh(self):
+        try:
+            if _stamp(self.path) != self._stamp:
+                self.load()
+        except OSError:
+            pass
+
+    def get(self, key):
+        if key not in self._data:
+            self._refresh()
+        value = self._data.get(key)
+        if value is None: self.misses += 1
+        else: self.hits += 1
+        return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._dirty = True
+
+    async def save(self):
+        """Writes pending entries to disk without blocking the event loop."""
+        if self._dirty:
+            await asyncio.to_thread(self.persist)
+
+    def persist(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(f"{self.path}.lock", "a") as lock:
+                    if fcntl: fcntl.flock(lock, fcntl.LOCK_EX)
+                    # Another process may have written entries this one hasn't seen; keep them.
+                    self._refresh()
+                    with open(tmp_path, "w", encoding="utf-8") as f:
+                        json.dump(self._data, f, ensure_ascii=False)
+                    os.replace(tmp_path, self.path)
+                    self._stamp = _stamp(self.path)
+            except Exception as e:
+                self._dirty = True
+                print(f"WARNING: Could not persist proposal text cache. Error: {e}")
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+proposal_text_cache = ProposalTextCache()
+
+async def get_proposal_text(category_data, category_name=None):
+    """
+    Returns the proposal introduction/scope text. Catalog rows are served from the cache;
+    anything else (custom "Other Requirement" requests, including rows from custom_estimator,
+    which carry `estimate_source`) always goes to the LLM.
+    """
+    if 'estimate_source' in category_data:
+        return await generate_descriptive_text(category_data, category_name)
+    if category_name and category_name != category_data.get('category'):
+        return await generate_descriptive_text(category_data, category_name)
+
+    key = proposal_text_key(category_data)
+    cached = proposal_text_cache.get(key)
+    if cached is not None:
+        return cached
+
+    proposal_text = await generate_descriptive_text(category_data)
+    if proposal_text:
+        proposal_text_cache.set(key, proposal_text)
+        await proposal_text_cache.save()
+    return proposal_text
+
+async def warm_proposal_cache(services_data):
+    """Pre-generates proposal text for every catalog row that is not cached yet."""
+    rows = [
+        row
+        for sub_categories in services_data.values()
+        for categories in sub_categories.values()
+        for row in categories.values()
+    ]
+    missing = {}
+    for row in rows:
+        key = proposal_text_key(row)
+        if key not in proposal_text_cache:
+            missing[key] = row
+    if not missing:
+        print("Proposal text cache is warm.")
+        return
+
+    print(f"Warming proposal text cache for {len(missing)} catalog entries...")
+    semaphore = asyncio.Semaphore(WARMUP_CONCURRENCY)
+    added = 0
+
+    async def warm(key, row):
+        nonlocal added
+        async with semaphore:
+            proposal_text = await generate_descriptive_text(row)
+            if proposal_text:
+                proposal_text_cache.set(key, proposal_text)
+                added += 1
+                if added % WARMUP_SAVE_EVERY == 0:
+                    await proposal_text_cache.save()
+
+    try:
+        await asyncio.gather(*(warm(key, row) for key, row in missing.items()))
+    finally:
+        await proposal_text_cache.save()
+    print(f"Proposal text cache warm-up finished: {len(proposal_text_cache)} entries.")
@@ -1,3 +1,15 @@
+# (line item, catalog column) in the order they appear on the proposal.
+COST_COMPONENTS = [
+    ("UI/UX Design", "ui_ux_cost_inr"),
+    ("Frontend Development", "frontend_cost_inr"),
+    ("Backend Development", "backend_cost_inr"),
+    ("Testing & QA", "qa_cost_inr"),
+    ("Project Management", "pm_cost_inr"),
+]
+OPTIONAL_ADDONS = ("Optional Add-ons", "optional_addons_cost_inr")
+# Every rate get_discount_for_company_size() can return.
+DISCOUNT_TIERS = (0.40, 0.25, 0.15, 0.10, 0.0)
+
 def get_discount_for_company_size(company_size: str):
     if company_size in "0-10": return 0.40
     if company_size in "10-100": return 0.25
@@ -22,14 +34,8 @@ def prepare_proposal_data(category_data, country_info, company_size):
             return f"{symbol}{local_amount:,.0f}"
         except Exception: return f"{symbol}0"
 
-    cost_components_inr = {
-        "UI/UX Design": safe_float(category_data.get('ui_ux_cost_inr')),
-        "Frontend Development": safe_float(category_data.get('frontend_cost_inr')),
-        "Backend Development": safe_float(category_data.get('backend_cost_inr')),
-        "Testing & QA": safe_float(category_data.get('qa_cost_inr')),
-        "Project Management": safe_float(category_data.get('pm_cost_inr'))
-    }
-    optional_addons_inr = safe_float(category_data.get('optional_addons_cost_inr'))
+    cost_components_inr = {name: safe_float(category_data.get(column)) for name, column in COST_COMPONENTS}
+    optional_addons_inr = safe_float(category_data.get(OPTIONAL_ADDONS[1]))
 
     # --- CRITICAL BUG FIX: ALWAYS CALCULATE SUBTOTAL FROM COMPONENTS ---
     subtotal_inr = sum(cost_components_inr.values()) + optional_addons_inr
@@ -37,7 +43,7 @@ def prepare_proposal_data(category_data, country_info, company_size):
     cost_breakdown = [
         {"item": name, "cost": convert_and_format(cost)} for name, cost in cost_components_inr.items()
     ]
-    cost_breakdown.append({"item": "Optional Add-ons", "cost": convert_and_format(optional_addons_inr)})
+    cost_breakdown.append({"item": OPTIONAL_ADDONS[0], "cost": convert_and_format(optional_addons_inr)})
 
     try:
         subtotal_local = subtotal_inr * exchange_rate
@@ -0,0 +1,191 @@
+# backend/proposal_pipeline.py
+
+import os
+import asyncio
+from datetime import datetime
+
+from country_data import countries
+from proposal_logic import prepare_proposal_data
+from proposal_cache import get_proposal_text
+from pdf_writer import create_proposal_pdf, create_sales_lead_pdf
+from mongo_handler import update_lead_details
+from email_client import build_message, pdf_attachment, send_messages
+
+SALES_TEAM_EMAIL = "partha@infinitetechai.com"
+STEP_RETRIES = int(os.getenv("PROPOSAL_STEP_RETRIES", "3"))
+STEP_BACKOFF_SECONDS = float(os.getenv("PROPOSAL_STEP_BACKOFF_SECONDS", "2"))
+# PDFs are rendered in memory and attached straight to the emails; set PROPOSAL_ARCHIVE_DIR
+# (e.g. "proposals") to also keep a copy on disk.
+PROPOSAL_ARCHIVE_DIR = os.getenv("PROPOSAL_ARCHIVE_DIR", "")
+
+
+class StepFailed(Exception):
+    """Raised when a pipeline step still fails after all of its retries."""
+
+
+def sanitize_filename(name):
+    return "".join([c if c.isalnum() else "_" for c in name])
+
+async def run_step(name, func, *args, critical=True, **kwargs):
+    """
+    Runs a step (blocking functions in a worker thread, coroutine functions on the loop),
+    retrying with exponential backoff. A step fails if it raises or returns False/None.
+    Non-critical steps log and continue.
+    """
+    last_error = None
+    for attempt in range(1, STEP_RETRIES + 1):
+        try:
+            if asyncio.iscoroutinefunction(func):
+                result = await func(*args, **kwargs)
+            else:
+                result = await asyncio.to_thread(func, *args, **kwargs)
+            if result is not False and result is not None:
+                return result
+            last_error = f"returned {result}"
+        except Exception as e:
+            last_error = repr(e)
+        print(f"--- Proposal step '{name}' failed (attempt {attempt}/{STEP_RETRIES}): {last_error} ---")
+        if attempt < STEP_RETRIES:
+            await asyncio.sleep(STEP_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+
+    if critical:
+        raise StepFailed(f"{name}: {last_error}")
+    return None
+
+async def run_stage_graph(stages, report=None):
+    """
+    Runs a dict of {name: (dependencies, async_fn)} as a dependency graph: every stage starts as soon
+    as its dependencies finish, and receives a dict of their results. The first failure cancels
+    all stages still running. Returns per-stage timings plus the critical path.
+    `report(step)` is awaited with the names of the stages running whenever one starts.
+    """
+    async def no_report(step): pass
+    report = report or no_report
+    loop = asyncio.get_running_loop()
+    started_at = loop.time()
+    results, timings, running = {}, {}, set()
+    tasks = {}
+
+    async def run(name):
+        deps, fn = stages[name]
+        if deps:
+            await asyncio.gather(*(tasks[d] for d in deps))
+        running.add(name)
+        await report(", ".join(sorted(running)))
+        start = loop.time()
+        try:
+            results[name] = await fn(results)
+        finally:
+            running.discard(name)
+            timings[name] = {
+                "start_ms": round((start - started_at) * 1000, 1),
+                "duration_ms": round((loop.time() - start) * 1000, 1),
+                "depends_on": list(deps),
+            }
+
+    for name in stages:
+        tasks[name] = asyncio.ensure_future(run(name))
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+
+    return {"total_ms": round((loop.time() - started_at) * 1000, 1), "critical_path": critical_path(timings), "stages": timings}
+
+def critical_path(timings):
+    """Walks back from the last stage to finish through whichever dependency finished last."""
+    def end(name): return timings[name]["start_ms"] + timings[name]["duration_ms"]
+    if not timings:
+        return []
+    path = [max(timings, key=end)]
+    while timings[path[-1]]["depends_on"]:
+        path.append(max(timings[path[-1]]["depends_on"], key=end))
+    return list(reversed(path))
+
+async def run_proposal_pipeline(catalog, user_details, category, custom_category_name, custom_category_data, report=None):
+    """
+    Builds and delivers one proposal. Independent stages run concurrently:
+
+        update_lead
+        costs ---------+--> sales_pdf ------------------+
+        proposal_text -+--> client_pdf (needs costs) ---+--> send_emails (one batched Mailjet call)
+
+    `report(step)` is awaited with the currently running stages. Returns the stage timings.
+    """
+    # Determine Data Source
+    catalog_row = None
+    if custom_category_name and not custom_category_data:
+        # "Other Requirement": estimate it from the most similar catalog rows instead of pricing it at 0.
+        custom_category_data = await catalog.estimator.estimate(custom_category_name, user_details.get('main_service'))
+    if custom_category_name and custom_category_data:
+        data_source = custom_category_data
+        user_details['category'] = custom_category_name
+    else:
+        main_service = user_details['main_service']
+        sub_cat = user_details.get('sub_category', '_default')
+        catalog_row = (main_service, sub_cat, category)
+        try: data_source = catalog.services_data[main_service][sub_cat][category]
+        except KeyError: data_source = {"cost": 0, "description": "Custom Requirement"}
+
+    user_details['contact'] = user_details.get('phone', 'N/A')
+    country_info = countries[user_details['country']]
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    project_slug = sanitize_filename(user_details.get('custom_category_name', user_details['category']))
+    file_prefix = f"{sanitize_filename(user_details['company'])}_{project_slug}_{timestamp}"
+    client_pdf_name = f"{file_prefix}_client.pdf"
+    sales_pdf_name = f"{file_prefix}_sales.pdf"
+
+    def archive_path(name):
+        return os.path.join(PROPOSAL_ARCHIVE_DIR, name) if PROPOSAL_ARCHIVE_DIR else None
+
+    async def update_lead(_):
+        await run_step("update_lead", update_lead_details, user_details["email"], user_details, critical=False)
+
+    async def costs(_):
+        # Catalog rows come from the precomputed price matrix; custom estimates are priced on the spot.
+        quote = catalog.prices.quote(*catalog_row, user_details['country'], user_details['company_size']) if catalog_row else None
+        return quote or prepare_proposal_data(data_source, country_info, user_details['company_size'])
+
+    async def proposal_text(_):
+        text = await get_proposal_text(data_source, user_details.get('category'))
+        return text or {"introduction": f"Proposal for {user_details.get('category')}"}
+
+    async def client_pdf(r):
+        return await run_step("client_pdf", create_proposal_pdf, user_details, r["proposal_text"], r["costs"], country_info, archive_path(client_pdf_name))
+
+    async def sales_pdf(r):
+        return await run_step("sales_pdf", create_sales_lead_pdf, user_details, r["costs"], archive_path(sales_pdf_name))
+
+    async def send_emails(r):
+        # Both emails go out in one Mailjet call; undelivered ones land in the outbox and are
+        # retried by the workers' flush_outbox(), so a delivery failure doesn't re-run the job.
+        messages = [
+            build_message(
+                receiver_email=user_details['email'],
+                subject=f"Project Proposal: {user_details.get('custom_category_name', user_details['category'])} | Infinite Tech",
+                body=f"Dear {user_details['name']},\n\nThank you for choosing Infinite Tech. Based on your requirements, we have prepared a detailed project proposal tailored to your needs.\n\nPlease find the document attached.\n\nBest Regards,\nThe Infinite Tech Team",
+                attachments=[pdf_attachment(client_pdf_name, r["client_pdf"])]
+            ),
+            build_message(
+                receiver_email=SALES_TEAM_EMAIL,
+                subject=f"🔥 HOT LEAD: {user_details['company']} - {user_details.get('category')}",
+                body=f"New Proposal Generated.\nClient: {user_details['name']}\nEmail: {user_details['email']}\nPhone: {user_details['phone']}\n\nSee full summary attached.",
+                attachments=[pdf_attachment(sales_pdf_name, r["sales_pdf"])]
+            ),
+        ]
+        return await asyncio.to_thread(send_messages, messages)
+
+    timings = await run_stage_graph({
+        "update_lead": ([], update_lead),
+        "costs": ([], costs),
+        "proposal_text": ([], proposal_text),
+        "client_pdf": (["proposal_text", "costs"], client_pdf),
+        "sales_pdf": (["costs"], sales_pdf),
+        "send_emails": (["client_pdf", "sales_pdf"], send_emails),
+    }, report)
+    print(f"--- Proposal pipeline finished in {timings['total_ms']} ms, critical path: {' -> '.join(timings['critical_path'])} ---")
+    return timings
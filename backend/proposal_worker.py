@@ -0,0 +1,153 @@
+# backend/proposal_worker.py
+#
+# Worker pool for proposal jobs. Workers are normally spawned by main.py on startup
+# (PROPOSAL_WORKERS, default 2), but can also be run standalone:  python proposal_worker.py
+
+import os
+import time
+import signal
+import asyncio
+import multiprocessing
+
+from job_queue import JobQueue
+from catalog_manager import CatalogManager, catalog_manager
+from proposal_cache import proposal_text_cache
+from mongo_handler import init_db, close_db, lead_buffer
+from llm_scheduler import llm_scheduler, LLM_BACKGROUND_SHARE
+
+PROPOSAL_JOB = "proposal"
+PROPOSAL_WORKERS = int(os.getenv("PROPOSAL_WORKERS", "2"))
+POLL_INTERVAL_SECONDS = float(os.getenv("PROPOSAL_POLL_SECONDS", "1"))
+OUTBOX_FLUSH_SECONDS = float(os.getenv("OUTBOX_FLUSH_SECONDS", "300"))
+# How long a stopping worker may take to finish its current job before it is killed.
+PROPOSAL_WORKER_STOP_SECONDS = float(os.getenv("PROPOSAL_WORKER_STOP_SECONDS", "60"))
+
+async def process_job(queue: JobQueue, catalogs: CatalogManager, job):
+    job_id = job["id"]
+    try:
+        payload = job["payload"]
+        # Price the proposal from the catalog version the conversation ran on.
+        version = payload["user_details"].get("catalog_version")
+        if version and catalogs.resolve(version).version != version:
+            await catalogs.reload()  # the web process may have picked up a new version first
+        catalog = catalogs.resolve(version)
+        # Imported on first job: the PDF/email stack is only needed once there is work to do.
+        from proposal_pipeline import run_proposal_pipeline
+        timings = await run_proposal_pipeline(
+            catalog,
+            payload["user_details"],
+            payload["category"],
+            payload.get("custom_category_name"),
+            payload.get("custom_category_data"),
+            report=lambda step: asyncio.to_thread(queue.update_step, job_id, step),
+        )
+        # A worker may be killed once its stop timeout runs out, so don't leave lead updates buffered.
+        await lead_buffer.flush()
+        await asyncio.to_thread(queue.complete, job_id, timings)
+        print(f"--- Proposal job {job_id} completed ---")
+    except Exception as e:
+        status = await asyncio.to_thread(queue.fail, job_id, repr(e), job["attempts"])
+        print(f"--- Proposal job {job_id} failed (attempt {job['attempts']}), now '{status}': {e} ---")
+
+async def worker_loop(catalogs: CatalogManager, queue: JobQueue | None = None, stop: asyncio.Event | None = None):
+    """Claims and runs jobs until cancelled or `stop` is set (checked between jobs); retries the email outbox while idle."""
+    queue = queue or JobQueue()
+    last_flush = time.monotonic()
+    while stop is None or not stop.is_set():
+        try:
+            job = await asyncio.to_thread(queue.claim)
+            if job is None:
+                if time.monotonic() - last_flush > OUTBOX_FLUSH_SECONDS:
+                    last_flush = time.monotonic()
+                    from email_client import flush_outbox
+                    sent, pending = await asyncio.to_thread(flush_outbox)
+                    if sent or pending:
+                        print(f"--- Outbox flush: {sent} sent, {pending} still pending ---")
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+                continue
+            await process_job(queue, catalogs, job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # A broken queue read or outbox flush must not end the loop: with PROPOSAL_WORKERS=0 nothing would restart it.
+            print(f"--- Proposal worker error, continuing: {e!r} ---")
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+def warm_prices(catalog):
+    print(f"Price matrix for catalog {catalog.version}: {catalog.prices.stats()}")
+
+def worker_main(stop_event=None):
+    """Entry point of a worker process: loads its own catalog, then runs the job loop until asked to stop."""
+    if catalog_manager.load() is None:
+        raise RuntimeError("FATAL: Proposal worker could not load service data.")
+    proposal_text_cache.load()
+    warm_prices(catalog_manager.current)
+    # This process's part of the background share of the LLM rate limits (see llm_scheduler).
+    llm_scheduler.scale(LLM_BACKGROUND_SHARE / max(1, PROPOSAL_WORKERS))
+    # Reloaded catalogs get their price matrix before their first job.
+    catalog_manager.add_listener(warm_prices)
+    print(f"Proposal worker {os.getpid()} ready.")
+    asyncio.run(worker_run(stop_event))
+
+async def _forward_stop(stop_event, stop: asyncio.Event):
+    while not stop_event.is_set():
+        await asyncio.sleep(0.5)
+    stop.set()
+
+async def worker_run(stop_event=None):
+    # SIGTERM/SIGINT (or the pool's stop event) let the current job finish instead of killing it
+    # between, say, sending the emails and marking the job complete, which would send them twice.
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # no signal handlers on this platform/thread
+    # The Mongo client has to be created inside the loop that uses it.
+    await init_db()
+    helpers = [asyncio.create_task(catalog_manager.watch())]
+    if stop_event is not None:
+        helpers.append(asyncio.create_task(_forward_stop(stop_event, stop)))
+    try:
+        await worker_loop(catalog_manager, stop=stop)
+    finally:
+        for task in helpers:
+            task.cancel()
+        await close_db()
+        print(f"Proposal worker {os.getpid()} stopped.")
+
+
+class WorkerPool:
+    """Worker processes sharing one stop event."""
+    def __init__(self, count: int):
+        ctx = multiprocessing.get_context("spawn")
+        self.stop_event = ctx.Event()
+        self.processes = []
+        for i in range(count):
+            process = ctx.Process(target=worker_main, args=(self.stop_event,), name=f"proposal-worker-{i}", daemon=True)
+            process.start()
+            self.processes.append(process)
+
+    def stop(self, timeout: float = PROPOSAL_WORKER_STOP_SECONDS):
+        """Asks every worker to stop after its current job; kills those still busy after `timeout`."""
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self.processes:
+            process.join(timeout=max(0.0, deadline - time.monotonic()))
+        for process in self.processes:
+            if process.is_alive():
+                # Its job is picked up again by another worker once the lease expires.
+                print(f"--- {process.name} did not stop within {timeout:.0f}s, killing it ---")
+                process.kill()
+                process.join(timeout=5)
+
+def start_workers(count: int = PROPOSAL_WORKERS):
+    return WorkerPool(count)
+
+def stop_workers(pool: WorkerPool | None):
+    if pool is not None:
+        pool.stop()
+
+if __name__ == "__main__":
+    worker_main()
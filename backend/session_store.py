@@ -0,0 +1,83 @@
+# backend/session_store.py
+
+import os
+import copy
+import uuid
+from abc import ABC, abstractmethod
+from cache import TTLCache
+
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", "3600"))
+SESSION_MAX_SESSIONS = int(os.getenv("SESSION_MAX_SESSIONS", "10000"))
+
+
+class SessionBackend(ABC):
+    """Storage interface for chat sessions. Implement get/set/delete to plug in e.g. Redis."""
+    @abstractmethod
+    def get(self, session_id: str):
+        ...
+
+    @abstractmethod
+    def set(self, session_id: str, state: dict):
+        ...
+
+    @abstractmethod
+    def delete(self, session_id: str):
+        ...
+
+    def stats(self):
+        return {}
+
+
+class MemorySessionBackend(SessionBackend):
+    """In-process sessions with TTL expiry and LRU eviction (one store per worker process)."""
+    def __init__(self, max_size: int = SESSION_MAX_SESSIONS, ttl: float = SESSION_TTL_SECONDS):
+        self._cache = TTLCache(max_size, ttl)
+
+    def get(self, session_id):
+        return self._cache.get(session_id)
+
+    def set(self, session_id, state):
+        self._cache.set(session_id, state)
+
+    def delete(self, session_id):
+        self._cache.delete(session_id)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+class SessionStore:
+    """
+    Server-side chat state ({"stage", "user_details"}) keyed by an opaque session id,
+    so clients only send the id and their input instead of the whole user_details blob.
+    """
+    def __init__(self, backend: SessionBackend):
+        self.backend = backend
+
+    def create(self, stage: str = "get_name"):
+        session_id = uuid.uuid4().hex
+        self.backend.set(session_id, {"stage": stage, "user_details": {"stage_history": []}})
+        return session_id
+
+    def load(self, session_id: str):
+        """Returns the stored state (treat as read-only), or None if it is unknown or expired."""
+        return self.backend.get(session_id)
+
+    def working_copy(self, state: dict):
+        return copy.deepcopy(state["user_details"])
+
+    def save(self, session_id: str, stage: str, user_details: dict):
+        self.backend.set(session_id, {"stage": stage, "user_details": user_details})
+
+    def stats(self):
+        return self.backend.stats()
+
+
+def diff_details(before: dict, after: dict):
+    """Returns (changed_fields, removed_keys) between two user_details dicts."""
+    changed = {key: value for key, value in after.items() if key not in before or before[key] != value}
+    removed = [key for key in before if key not in after]
+    return changed, removed
+
+
+session_store = SessionStore(MemorySessionBackend())
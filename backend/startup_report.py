@@ -0,0 +1,51 @@
+# backend/startup_report.py
+
+import sys
+import time
+from contextlib import contextmanager
+
+# Modules that should only load on first use (or in the background), never on the import path of /.
+HEAVY_MODULES = ["pandas", "numpy", "openpyxl", "fpdf", "groq", "httpx", "pymongo", "motor", "requests", "phonenumbers"]
+
+
+class StartupReport:
+    """Wall-clock time per startup phase (imports, data loads, background init)."""
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self.ready_ms = None
+        self.heavy_at_ready = None
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                "phase": name,
+                "start_ms": round((start - self.started) * 1000, 1),
+                "duration_ms": round((time.perf_counter() - start) * 1000, 1),
+            })
+
+    def mark_ready(self):
+        """Called once the app can serve requests; records which heavy modules were already loaded."""
+        self.ready_ms = round((time.perf_counter() - self.started) * 1000, 1)
+        self.heavy_at_ready = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    def summary(self):
+        return {
+            "ready_ms": self.ready_ms,
+            "heavy_modules_at_ready": self.heavy_at_ready,
+            "heavy_modules_now": [name for name in HEAVY_MODULES if name in sys.modules],
+            "phases": self.phases,
+        }
+
+    def print(self):
+        print(f"--- Startup report: ready after {self.ready_ms} ms ---")
+        for p in self.phases:
+            print(f"    {p['phase']:<28} start {p['start_ms']:>8.1f} ms   took {p['duration_ms']:>8.1f} ms")
+        print(f"    heavy modules loaded at ready: {', '.join(self.heavy_at_ready) or 'none'}")
+
+
+startup_report = StartupReport()
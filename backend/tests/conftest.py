@@ -0,0 +1,20 @@
+# backend/tests/conftest.py
+#
+# Run from the backend directory:  python -m pytest -q tests
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Importing main opens the default job queue; keep it out of the working tree.
+os.environ.setdefault("JOB_DB_PATH", os.path.join(tempfile.mkdtemp(), "proposal_jobs.db"))
+
+
+@pytest.fixture(scope="session")
+def catalog():
+    """The catalog from the checked-in snapshot/spreadsheets."""
+    from catalog_manager import catalog_manager
+    return catalog_manager.load()
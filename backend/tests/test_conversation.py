@@ -0,0 +1,236 @@
+# backend/tests/test_conversation.py
+#
+# Drives ConversationEngine.dispatch through the /chat flows; the replies and stages are the ones
+# the original handle_chat if/elif chain produced.
+
+import asyncio
+
+import pytest
+
+import conversation
+from catalog_manager import catalog_manager
+from conversation import ConversationEngine, BACK_COMMAND, INITIAL_CHOICE_BUTTONS, GENERATE_BUTTONS, CANCELLED_BUTTONS, SUCCESS_BUTTONS
+
+
+class Chat:
+    """One conversation: say() dispatches a message at the current stage and follows the reply."""
+    def __init__(self, engine, stage="get_name", user_details=None):
+        self.engine = engine
+        self.stage = stage
+        self.user_details = user_details if user_details is not None else {}
+
+    def say(self, text):
+        response = asyncio.run(self.engine.dispatch(self.stage, self.user_details, text))
+        if response is not None:
+            self.stage, self.user_details = response.next_stage, response.user_details
+        return response
+
+@pytest.fixture
+def saved_leads(monkeypatch):
+    leads = []
+    async def save_lead(lead_data):
+        leads.append(dict(lead_data))
+        return True
+    monkeypatch.setattr(conversation, "save_lead", save_lead)
+    return leads
+
+@pytest.fixture
+def chat(catalog, saved_leads):
+    return Chat(ConversationEngine(catalog_manager))
+
+def lead_details(chat, **extra):
+    """Puts `chat` at get_main_service with every lead detail already collected."""
+    chat.stage = "get_main_service"
+    chat.user_details = {
+        "stage_history": ["initial_choice", "get_email", "get_phone", "get_company", "get_company_size", "get_budget"],
+        "name": "Asha Rao", "email": "asha@acme.com", "phone": "9876543210", "country": "India",
+        "company": "Acme", "company_size": "11-50", "budget": "₹100,000 - ₹400,000", **extra,
+    }
+    return chat
+
+
+def test_service_flow_up_to_the_proposal(chat, catalog, saved_leads):
+    reply = chat.say("new proposal")
+    assert reply.next_stage == "get_name" and reply.bot_message.startswith("Hello! Welcome to **Infinite Tech**.")
+    reply = chat.say("Asha Rao")
+    assert reply.next_stage == "initial_choice" and reply.ui_elements == INITIAL_CHOICE_BUTTONS
+    assert reply.bot_message == "Pleasure to meet you, **Asha Rao**. I am the Infinite Tech AI. How may I assist you today?"
+    assert chat.say("Explore Services").next_stage == "get_email"
+    assert chat.say("asha@acme.com").ui_elements == catalog.options.phone_form
+    reply = chat.say("India:98765 43210")
+    assert reply.next_stage == "get_company" and reply.bot_message == "Details saved. What is the name of your **Company or Organization**?"
+    assert [lead["email"] for lead in saved_leads] == ["asha@acme.com"]
+    assert saved_leads[0]["country"] == "India" and saved_leads[0]["phone"] == "98765 43210"
+    assert chat.say("Acme").next_stage == "get_company_size"
+    reply = chat.say("11-50")
+    assert reply.next_stage == "get_budget" and reply.bot_message == "What is your estimated **Project Budget** (INR)?"
+    budget = reply.ui_elements["options"][0]
+    assert chat.say(budget).ui_elements == catalog.options.main_service_cards
+    reply = chat.say("SEO Services")
+    assert reply.next_stage == "get_specific_service" and reply.bot_message == "Please select the **Service Type**."
+    assert chat.say("Basic SEO Plan").next_stage == "get_optional_features"
+    reply = chat.say("Monthly reports")
+    assert reply.next_stage == "confirm_proposal" and reply.ui_elements == GENERATE_BUTTONS
+    assert reply.bot_message == (
+        f"**Proposal Ready**\n\n• **Service:** Basic SEO Plan\n• **Budget:** {budget}\n• **Email:** asha@acme.com\n\nShall I generate the PDF now?"
+    )
+    assert chat.user_details["stage_history"] == [
+        "initial_choice", "get_email", "get_phone", "get_company", "get_company_size",
+        "get_budget", "get_main_service", "get_specific_service", "get_optional_features",
+    ]
+    # The frontend generates the proposal on final_generation, then sends one more (empty) turn.
+    reply = chat.say("Yes, Generate Proposal")
+    assert reply.next_stage == "final_generation" and reply.bot_message == "Processing your request. Please wait..."
+    reply = chat.say("")
+    assert reply.next_stage == "post_engagement" and reply.ui_elements == SUCCESS_BUTTONS
+    assert {"main_service": "SEO Services", "category": "Basic SEO Plan", "description": "Monthly reports"}.items() <= chat.user_details.items()
+
+def test_app_development_goes_through_platform_and_refinement(chat, catalog):
+    lead_details(chat)
+    reply = chat.say("App Development")
+    assert reply.next_stage == "get_sub_category" and reply.bot_message == "Please specify the **App Platform**."
+    platform = reply.ui_elements["options"][0]
+    reply = chat.say(platform)
+    assert reply.next_stage == "get_specific_service" and reply.bot_message == "Please refine your selection."
+    assert list(reply.ui_elements["options"]) == catalog.app_sub_category_definitions[platform] + ["Other Requirement"]
+
+def test_other_requirement_asks_for_a_description(chat):
+    lead_details(chat)
+    chat.say("SEO Services")
+    reply = chat.say("Other Requirement")
+    assert reply.next_stage == "get_other_service_name" and reply.bot_message == "Please briefly **describe your specific requirement**."
+    assert chat.user_details["category"] == "Others"
+
+def test_invalid_email_and_phone_are_asked_again(chat, catalog, saved_leads):
+    chat.stage, chat.user_details = "get_email", {"name": "Asha Rao"}
+    reply = chat.say("asha at acme")
+    assert reply.next_stage == "get_email"
+    assert reply.bot_message == "I apologize, but that email format seems incorrect. Please enter a valid **name@company.com** address."
+    chat.say("asha@acme.com")
+    for bad in ["9876543210", "India:98765", "India:98765abcde"]:
+        reply = chat.say(bad)
+        assert reply.next_stage == "get_phone" and reply.ui_elements == catalog.options.phone_form
+        assert reply.bot_message.startswith("That phone number appears invalid.")
+    assert saved_leads == [] and "phone" not in chat.user_details
+
+def test_careers_flow(chat):
+    chat.stage, chat.user_details = "initial_choice", {"name": "Asha Rao"}
+    assert chat.say("Career Opportunities").next_stage == "get_email_for_job"
+    reply = chat.say("not an email")
+    assert reply.next_stage == "get_email_for_job" and reply.bot_message == "Please provide a valid **Email Address** for our HR team."
+    reply = chat.say("asha@acme.com")
+    assert reply.next_stage == "job_application"
+    assert reply.ui_elements == {"type": "file_upload", "upload_to": "/upload-resume", "user_email": "asha@acme.com"}
+    reply = chat.say("Uploaded resume.pdf")
+    assert reply.next_stage == "post_engagement" and reply.bot_message.startswith("Resume received successfully.")
+
+def test_commands_work_at_any_stage(chat):
+    lead_details(chat)
+    reply = chat.say("HELP")
+    assert reply.next_stage == "get_main_service" and "support@infinitetech.in" in reply.bot_message
+    assert chat.user_details["name"] == "Asha Rao"
+    reply = chat.say("start over")
+    assert reply.next_stage == "get_name" and reply.bot_message == "System reset. Let's start fresh. May I have your **Full Name**?"
+    assert reply.user_details == {"stage_history": []}
+
+def test_back_pops_the_history_and_re_prompts(chat, catalog):
+    lead_details(chat)
+    reply = chat.say(BACK_COMMAND)
+    assert reply.next_stage == "get_budget" and reply.bot_message == "Returning to previous step..."
+    chat.user_details["stage_history"] = ["initial_choice", "get_email", "get_phone"]
+    reply = chat.say(BACK_COMMAND)
+    assert reply.next_stage == "get_phone" and reply.ui_elements == catalog.options.phone_form
+    assert chat.say(BACK_COMMAND).bot_message == "Please enter your **Business Email Address**."
+    reply = chat.say(BACK_COMMAND)
+    assert reply.next_stage == "initial_choice" and reply.bot_message == "Welcome back, **Asha Rao**. How can we assist you?"
+    reply = chat.say(BACK_COMMAND)
+    assert reply.next_stage == "initial_choice" and reply.bot_message == "We are at the beginning of the conversation."
+
+def test_history_skips_untracked_stages(chat):
+    chat.stage, chat.user_details = "confirm_proposal", {"stage_history": ["get_optional_features"], "name": "Asha Rao"}
+    reply = chat.say("No, Cancel")
+    assert reply.next_stage == "post_engagement" and reply.ui_elements == CANCELLED_BUTTONS
+    chat.say("Contact Support")
+    assert chat.user_details["stage_history"] == ["get_optional_features"]
+
+def test_post_engagement_buttons(chat):
+    chat.stage, chat.user_details = "post_engagement", {"stage_history": ["initial_choice", "get_email"], "name": "Asha Rao"}
+    assert chat.say("Visit Website").bot_message == "You can visit us at **infinitetechai.com**."
+    assert chat.say("Contact Sales").bot_message.startswith("You can reach our sales team")
+    assert chat.say("Main Menu").bot_message == "Main Menu:"
+    chat.stage = "post_engagement"
+    reply = chat.say("Create Another Proposal")
+    assert reply.next_stage == "initial_choice" and reply.bot_message == "Certainly, **Asha Rao**. What service are you looking for this time?"
+    assert chat.user_details["stage_history"] == []
+
+def test_stage_timings_are_recorded(chat):
+    seen = []
+    chat.engine.add_timing_hook(lambda name, seconds: seen.append(name))
+    chat.say("new proposal")
+    chat.say("Asha Rao")
+    assert seen == ["command:new proposal", "get_name"]
+    assert chat.engine.stats()["get_name"]["calls"] == 1
+
+
+# --- ROUTING INSIDE DISPATCH ---
+def test_typo_of_a_button_is_snapped(chat):
+    chat.stage, chat.user_details = "initial_choice", {"name": "Asha Rao"}
+    assert chat.say("explore servces").next_stage == "get_email"
+    assert chat.engine.routing_stats()["snapped"] == 1
+
+def test_ambiguous_yes_and_no_is_asked_again(chat):
+    chat.stage, chat.user_details = "confirm_proposal", {"name": "Asha Rao", "category": "Basic SEO Plan"}
+    reply = chat.say("nope, yes")
+    assert reply.next_stage == "confirm_proposal" and reply.bot_message == "Please confirm: Shall I generate the proposal?"
+
+def test_open_question_at_a_button_stage_goes_to_the_llm(chat):
+    chat.stage, chat.user_details = "initial_choice", {"name": "Asha Rao"}
+    assert chat.say("what services do you offer") is None
+    assert chat.stage == "initial_choice"
+    assert chat.engine.routing_stats()["llm_fallback"] == 1
+
+def test_price_remark_does_not_restart_a_confirmed_selection(chat):
+    lead_details(chat)
+    chat.say("SEO Services")
+    chat.say("Basic SEO Plan")
+    chat.say("Monthly reports")
+    reply = chat.say("the price is too high")
+    assert reply.next_stage == "confirm_proposal" and reply.bot_message == "Please confirm: Shall I generate the proposal?"
+    assert chat.user_details["category"] == "Basic SEO Plan"
+    assert "intent:pricing" not in chat.engine.routing_stats()
+
+def test_intents_still_route_at_button_stages(chat):
+    lead_details(chat)
+    reply = chat.say("I want an app")
+    assert reply.next_stage == "get_sub_category" and chat.user_details["main_service"] == "App Development"
+    chat.stage, chat.user_details = "initial_choice", {"name": "Asha Rao"}
+    assert chat.say("show me pricing").next_stage == "get_email"
+
+def test_described_requirement_only_suggests_a_catalog_match(chat):
+    lead_details(chat)
+    chat.say("SEO Services")
+    chat.say("Other Requirement")
+    reply = chat.say("advanced seo plan")
+    assert reply.next_stage == "confirm_catalog_match" and "**Advanced SEO Plan**" in reply.bot_message
+    assert chat.user_details["category"] == "Others" and chat.user_details["custom_category_name"] == "advanced seo plan"
+    reply = chat.say("No, Keep My Requirement")
+    assert reply.next_stage == "get_optional_features"
+    assert chat.user_details["category"] == "Others" and chat.user_details["custom_category_name"] == "advanced seo plan"
+    assert "suggested_match" not in chat.user_details
+
+def test_suggested_catalog_match_applies_once_confirmed(chat):
+    lead_details(chat)
+    chat.say("SEO Services")
+    chat.say("Other Requirement")
+    chat.say("advanced seo plan")
+    reply = chat.say("yes")
+    assert reply.next_stage == "get_optional_features"
+    assert chat.user_details["category"] == "Advanced SEO Plan" and "custom_category_name" not in chat.user_details
+
+def test_description_without_a_catalog_match_stays_custom(chat):
+    lead_details(chat)
+    chat.say("SEO Services")
+    chat.say("Other Requirement")
+    reply = chat.say("local listings for our bakery chain")
+    assert reply.next_stage == "get_optional_features" and reply.bot_message == "Understood. Any **additional requirements**?"
+    assert chat.user_details["custom_category_name"] == "local listings for our bakery chain"
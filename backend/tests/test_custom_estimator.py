@@ -0,0 +1,57 @@
+# backend/tests/test_custom_estimator.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import custom_estimator
+from custom_estimator import CustomEstimator, COST_COLUMNS
+from catalog_search import CatalogSearchIndex
+
+def row(category, cost):
+    return {"category": category, "project_overview": "", "core_modules": "", **{column: cost for column in COST_COLUMNS}}
+
+def make_catalog(services_data):
+    catalog = SimpleNamespace(services_data=services_data)
+    catalog.search_index = CatalogSearchIndex(catalog)
+    return catalog
+
+@pytest.fixture
+def llm(monkeypatch):
+    answers = []
+    async def fake_estimate(service_name, main_service, examples):
+        return answers.pop(0) if answers else None
+    monkeypatch.setattr(custom_estimator, "estimate_custom_service_cost", fake_estimate)
+    return answers
+
+
+def test_catalog_without_priced_rows_uses_the_llm_answer(llm):
+    estimator = CustomEstimator(make_catalog({"SEO Services": {"_default": {"Basic SEO Plan": row("Basic SEO Plan", 0)}}}))
+    assert estimator.ranges == {}
+    llm.append({column: 1000 for column in COST_COLUMNS})
+    estimate = asyncio.run(estimator.estimate("Local SEO", "SEO Services"))
+    assert estimate["estimate_source"] == "llm" and estimate["avg_cost_inr"] == 5000
+
+def test_service_without_priced_rows_borrows_other_services(llm):
+    estimator = CustomEstimator(make_catalog({
+        "SEO Services": {"_default": {"Basic SEO Plan": row("Basic SEO Plan", 0)}},
+        "Web Development": {"_default": {"Business Website": row("Business Website", 20000)}},
+    }))
+    estimate = asyncio.run(estimator.estimate("Local SEO", "SEO Services"))
+    assert estimate["estimate_source"] == "neighbours" and estimate["avg_cost_inr"] == 100000
+
+def test_llm_estimate_is_scaled_into_the_catalog_range(llm):
+    estimator = CustomEstimator(make_catalog({"SEO Services": {"_default": {
+        "Basic SEO Plan": row("Basic SEO Plan", 1000), "Advanced SEO Plan": row("Advanced SEO Plan", 2000),
+    }}}))
+    llm.append({column: 1_000_000 for column in COST_COLUMNS})
+    estimate = asyncio.run(estimator.estimate("Enterprise SEO", "SEO Services"))
+    assert estimate["avg_cost_inr"] == 12500  # highest subtotal 10000, plus ESTIMATE_RANGE_SLACK (25%)
+    assert estimator.counts["scaled_into_range"] == 1
+
+def test_estimates_are_cached_by_normalized_name(llm):
+    estimator = CustomEstimator(make_catalog({"SEO Services": {"_default": {"Basic SEO Plan": row("Basic SEO Plan", 1000)}}}))
+    first = asyncio.run(estimator.estimate("Local SEO", "SEO Services"))
+    llm.append({column: 1500 for column in COST_COLUMNS})  # would change the answer if asked again
+    assert asyncio.run(estimator.estimate("  local   seo ", "SEO Services")) == first
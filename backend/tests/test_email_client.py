@@ -0,0 +1,83 @@
+# backend/tests/test_email_client.py
+
+import os
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import email_client
+from email_client import build_message, send_messages, flush_outbox
+
+
+class FakeSession:
+    """Answers each post() with the next (status_code, body) and records the messages sent."""
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.sent = []
+
+    def post(self, url, auth=None, json=None, timeout=None):
+        self.sent.append([m["To"][0]["Email"] for m in json["Messages"]])
+        status_code, body = self.answers.pop(0)
+        return SimpleNamespace(status_code=status_code, json=lambda: body, text=str(body))
+
+def success():
+    return {"Status": "success"}
+
+def rejected():
+    return {"Status": "error", "Errors": [{"ErrorCode": "mj-0013", "StatusCode": 400, "ErrorMessage": "invalid email"}]}
+
+def entries(directory):
+    if not os.path.isdir(directory):
+        return []
+    out = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".json"):
+            with open(os.path.join(directory, name), encoding="utf-8") as f:
+                out.append(json.load(f))
+    return out
+
+@pytest.fixture
+def outbox(tmp_path, monkeypatch):
+    monkeypatch.setenv("MAILJET_API_KEY", "k")
+    monkeypatch.setenv("MAILJET_SECRET_KEY", "s")
+    monkeypatch.setattr(email_client, "OUTBOX_DIR", str(tmp_path / "outbox"))
+    monkeypatch.setattr(email_client, "MAILJET_BACKOFF_SECONDS", 0)
+    return str(tmp_path / "outbox")
+
+def use(monkeypatch, session):
+    monkeypatch.setattr(email_client, "get_session", lambda: session)
+    return session
+
+def messages(*emails):
+    return [build_message(email, "Proposal", "Hello") for email in emails]
+
+
+def test_mixed_400_only_keeps_the_rejected_message(outbox, monkeypatch):
+    use(monkeypatch, FakeSession((400, {"Messages": [success(), rejected()]})))
+    assert send_messages(messages("ok@example.com", "bad@example")) == [True, False]
+    assert entries(outbox) == []  # nothing to retry: the delivered one must not be sent again
+    failed = entries(os.path.join(outbox, "failed"))
+    assert [e["message"]["To"][0]["Email"] for e in failed] == ["bad@example"]
+
+def test_transient_failures_are_retried_until_max_attempts(outbox, monkeypatch):
+    monkeypatch.setattr(email_client, "OUTBOX_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(email_client, "MAILJET_RETRIES", 1)
+    session = use(monkeypatch, FakeSession(*[(503, {})] * 3))
+    assert send_messages(messages("a@example.com")) == [False]
+    assert [e["attempts"] for e in entries(outbox)] == [1]
+    assert flush_outbox() == (0, 1)
+    assert [e["attempts"] for e in entries(outbox)] == [2]
+    assert flush_outbox() == (0, 1)
+    assert entries(outbox) == []
+    assert [e["attempts"] for e in entries(os.path.join(outbox, "failed"))] == [3]
+    assert flush_outbox() == (0, 0)  # failed/ is never retried
+    assert len(session.sent) == 3
+
+def test_flush_sends_outbox_entries_once(outbox, monkeypatch):
+    use(monkeypatch, FakeSession((503, {})))
+    monkeypatch.setattr(email_client, "MAILJET_RETRIES", 1)
+    send_messages(messages("a@example.com"))
+    session = use(monkeypatch, FakeSession((200, {"Messages": [success()]})))
+    assert flush_outbox() == (1, 0)
+    assert entries(outbox) == [] and session.sent == [["a@example.com"]]
@@ -0,0 +1,42 @@
+# backend/tests/test_intent_router.py
+
+import intent_router
+from intent_router import IntentRouter
+
+
+def test_typos_are_corrected(catalog):
+    router = IntentRouter(catalog)
+    assert router.correct("pricng") == "pricing"
+    found = router.classify("pricng")
+    assert (found.name, found.slot) == ("pricing", None)
+
+def test_correction_cache_is_bounded(catalog, monkeypatch):
+    monkeypatch.setattr(intent_router, "ROUTER_CORRECTION_CACHE_SIZE", 8)
+    router = IntentRouter(catalog)
+    for i in range(100):
+        router.correct(f"zzqx{i:03d}")
+    assert len(router._corrections) == 8
+    assert router.correct("pricng") == "pricing"
+
+def test_snap_needs_one_clear_choice(catalog):
+    router = IntentRouter(catalog)
+    choices = ["Yes, Generate Proposal", "No, Cancel"]
+    assert router.snap("yess", choices) == "Yes, Generate Proposal"
+    assert router.snap("nope", choices) == "No, Cancel"
+    assert router.snap("nope, yes", choices) is None
+    assert router.snap("yes no", choices) is None
+    assert router.snap("should I say yes?", choices) is None
+    assert router.snap("Visit", ["Visit Website", "Contact Sales"]) == "Visit Website"
+
+def test_snap_leaves_questions_alone(catalog):
+    router = IntentRouter(catalog)
+    assert router.snap("what services do you offer", ["Explore Services", "Career Opportunities"]) is None
+    assert router.snap("explore servces", ["Explore Services", "Career Opportunities"]) == "Explore Services"
+
+def test_snap_requires_a_margin(catalog, monkeypatch):
+    router = IntentRouter(catalog)
+    choices = ["Basic SEO Plan", "Basic Web Plan Deluxe"]
+    assert router.snap("basic seo", choices) == "Basic SEO Plan"
+    assert router.snap("basic seo web", choices) is None  # 1/3 vs 1/4 of each label's words
+    monkeypatch.setattr(intent_router, "ROUTER_MIN_MARGIN", 0.05)
+    assert router.snap("basic seo web", choices) == "Basic SEO Plan"
@@ -0,0 +1,90 @@
+# backend/tests/test_job_queue.py
+
+import sqlite3
+
+import pytest
+
+import job_queue
+from job_queue import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return JobQueue(str(tmp_path / "jobs.db"))
+
+def expire_lease(queue, job_id):
+    conn = sqlite3.connect(queue.path)
+    conn.execute("UPDATE jobs SET updated_at = updated_at - ? WHERE id = ?", (job_queue.JOB_LEASE_SECONDS + 1, job_id))
+    conn.commit()
+    conn.close()
+
+def make_due(queue, job_id):
+    conn = sqlite3.connect(queue.path)
+    conn.execute("UPDATE jobs SET run_after = 0 WHERE id = ?", (job_id,))
+    conn.commit()
+    conn.close()
+
+
+def test_claim_takes_oldest_queued_job_once(queue):
+    first = queue.enqueue("proposal", {"n": 1})
+    queue.enqueue("proposal", {"n": 2})
+    job = queue.claim()
+    assert job["id"] == first and job["status"] == "running" and job["attempts"] == 1
+    assert job["payload"] == {"n": 1}
+    assert queue.claim()["payload"] == {"n": 2}
+    assert queue.claim() is None
+
+def test_running_job_is_not_reclaimed_while_its_lease_holds(queue):
+    job_id = queue.enqueue("proposal", {})
+    queue.claim()
+    assert queue.claim() is None
+    assert queue.get(job_id)["status"] == "running"
+
+def test_expired_lease_is_reclaimed_as_another_attempt(queue):
+    job_id = queue.enqueue("proposal", {})
+    queue.claim()
+    expire_lease(queue, job_id)
+    job = queue.claim()
+    assert job["id"] == job_id and job["attempts"] == 2
+
+def test_expired_lease_on_final_attempt_marks_job_failed(queue):
+    job_id = queue.enqueue("proposal", {})
+    for _ in range(job_queue.JOB_MAX_ATTEMPTS):
+        assert queue.claim()["id"] == job_id
+        expire_lease(queue, job_id)
+    assert queue.claim() is None
+    job = queue.get(job_id)
+    assert job["status"] == "failed" and job["error"] == "lease expired"
+    assert queue.counts() == {"failed": 1}
+
+def test_fail_requeues_until_attempts_are_exhausted(queue):
+    job_id = queue.enqueue("proposal", {})
+    for attempt in range(1, job_queue.JOB_MAX_ATTEMPTS + 1):
+        job = queue.claim()
+        assert job["attempts"] == attempt
+        status = queue.fail(job_id, "boom", job["attempts"])
+        assert status == ("failed" if attempt == job_queue.JOB_MAX_ATTEMPTS else "queued")
+        make_due(queue, job_id)
+    assert queue.claim() is None
+    assert queue.get(job_id)["error"] == "boom"
+
+def test_complete_records_timings(queue):
+    job_id = queue.enqueue("proposal", {})
+    queue.update_step(job_id, "client_pdf")
+    assert queue.get(job_id)["step"] == "client_pdf"
+    queue.complete(job_id, {"total_ms": 12.5})
+    job = queue.get(job_id)
+    assert job["status"] == "completed" and job["timings"] == {"total_ms": 12.5}
+
+def test_failed_job_waits_out_its_backoff(queue, monkeypatch):
+    monkeypatch.setattr(job_queue.time, "time", lambda: 1000.0)
+    job_id = queue.enqueue("proposal", {})
+    queue.fail(job_id, "mail provider down", queue.claim()["attempts"])
+    assert queue.claim() is None
+    monkeypatch.setattr(job_queue.time, "time", lambda: 1000.0 + job_queue.retry_delay(1))
+    assert queue.claim()["attempts"] == 2
+
+def test_backoff_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_RETRY_BASE_SECONDS", 30)
+    monkeypatch.setattr(job_queue, "JOB_RETRY_MAX_SECONDS", 100)
+    assert [job_queue.retry_delay(n) for n in (1, 2, 3, 4)] == [30, 60, 100, 100]
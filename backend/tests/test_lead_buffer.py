@@ -0,0 +1,128 @@
+# backend/tests/test_lead_buffer.py
+
+import asyncio
+
+import pytest
+
+from pymongo.errors import BulkWriteError
+
+import mongo_handler
+from mongo_handler import LeadWriteBuffer
+
+
+class FakeCollection:
+    """
+    Records bulk_write calls as {email: (fields, upsert)}; `fail` makes the next N calls raise.
+    Like MongoDB, an update whose fields include `reject_code` (as {"code": ...}) fails on its own.
+    """
+    def __init__(self, fail=0, during_write=None):
+        self.writes = []
+        self.fail = fail
+        self.during_write = during_write
+
+    async def bulk_write(self, operations, ordered=True):
+        if self.during_write:
+            self.during_write()
+        if self.fail:
+            self.fail -= 1
+            raise RuntimeError("primary stepped down")
+        written, write_errors = {}, []
+        for index, op in enumerate(operations):
+            fields = op._doc["$set"]
+            if "reject_code" in fields:
+                write_errors.append({"index": index, "code": fields["reject_code"], "errmsg": "rejected"})
+            else:
+                written[op._filter["email"]] = (fields, op._upsert)
+        self.writes.append(written)
+        if write_errors:
+            raise BulkWriteError({"writeErrors": write_errors, "writeConcernErrors": [], "nModified": len(written)})
+
+@pytest.fixture
+def collection(monkeypatch):
+    fake = FakeCollection()
+    monkeypatch.setattr(mongo_handler, "collection", fake)
+    return fake
+
+
+def test_updates_are_merged_per_email(collection):
+    async def run():
+        buffer = LeadWriteBuffer(interval_ms=60_000)
+        buffer.start()
+        buffer.add("a@x.com", {"name": "A", "stage": "one"}, upsert=True)
+        buffer.add("a@x.com", {"stage": "two"}, upsert=False)
+        buffer.add("b@x.com", {"name": "B"}, upsert=False)
+        await buffer.flush()
+        await buffer.stop()
+        return buffer
+    buffer = asyncio.run(run())
+    assert collection.writes == [{"a@x.com": ({"name": "A", "stage": "two"}, True), "b@x.com": ({"name": "B"}, False)}]
+    assert buffer.stats()["documents_written"] == 2
+
+def test_stop_flushes_pending_updates(collection):
+    async def run():
+        buffer = LeadWriteBuffer(interval_ms=60_000)  # the timer never fires during the test
+        buffer.start()
+        buffer.add("a@x.com", {"name": "A"}, upsert=True)
+        await buffer.stop()
+        return buffer
+    buffer = asyncio.run(run())
+    assert collection.writes == [{"a@x.com": ({"name": "A"}, True)}]
+    assert not buffer.running and buffer.stats()["pending"] == 0
+
+def test_failed_bulk_write_requeues_under_newer_updates(collection):
+    async def run():
+        buffer = LeadWriteBuffer(interval_ms=60_000)
+        buffer.start()
+        buffer.add("a@x.com", {"name": "A", "stage": "old"}, upsert=True)
+        # While the failing write is in flight, a newer update for the same lead arrives.
+        collection.fail = 1
+        collection.during_write = lambda: buffer.add("a@x.com", {"stage": "new"}, upsert=False) if collection.fail else None
+        await buffer.flush()
+        assert buffer.stats()["pending"] == 1 and buffer.stats()["errors"] == 1
+        await buffer.stop()
+        return buffer
+    buffer = asyncio.run(run())
+    assert collection.writes == [{"a@x.com": ({"name": "A", "stage": "new"}, True)}]
+    assert buffer.stats()["pending"] == 0
+
+def test_rejected_update_is_dropped_without_holding_back_the_batch(collection):
+    async def run():
+        buffer = LeadWriteBuffer(interval_ms=60_000)
+        buffer.start()
+        buffer.add("bad@x.com", {"reject_code": 52}, upsert=True)  # DollarPrefixedFieldName
+        buffer.add("good@x.com", {"name": "G"}, upsert=True)
+        await buffer.flush()
+        await buffer.stop()
+        return buffer
+    buffer = asyncio.run(run())
+    assert collection.writes == [{"good@x.com": ({"name": "G"}, True)}]
+    stats = buffer.stats()
+    assert stats["pending"] == 0 and stats["documents_written"] == 1 and stats["dropped"] == 1
+
+def test_update_failing_for_a_transient_reason_is_retried(collection):
+    async def run():
+        buffer = LeadWriteBuffer(interval_ms=60_000)
+        buffer.start()
+        buffer.add("raced@x.com", {"reject_code": 112}, upsert=True)  # WriteConflict
+        buffer.add("good@x.com", {"name": "G"}, upsert=True)
+        await buffer.flush()  # not stop(): the fake would reject it forever
+        return buffer.stats()
+    stats = asyncio.run(run())
+    assert stats["pending"] == 1 and stats["documents_written"] == 1 and stats["dropped"] == 0
+    assert collection.writes == [{"good@x.com": ({"name": "G"}, True)}]
+
+def test_invalid_field_name_does_not_poison_the_buffer_on_mongomock(monkeypatch):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+
+    async def run():
+        leads = mongomock_motor.AsyncMongoMockClient()["db"]["leads"]
+        monkeypatch.setattr(mongo_handler, "collection", leads)
+        buffer = LeadWriteBuffer(interval_ms=60_000)
+        buffer.start()
+        buffer.add("bad@x.com", {"$bad": 1}, upsert=True)
+        buffer.add("good@x.com", {"name": "G"}, upsert=True)
+        await buffer.stop()
+        return buffer, [doc["email"] async for doc in leads.find()]
+    buffer, emails = asyncio.run(run())
+    assert emails == ["good@x.com"]
+    assert buffer.stats()["pending"] == 0 and buffer.stats()["dropped"] == 1
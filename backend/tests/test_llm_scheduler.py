@@ -0,0 +1,65 @@
+# backend/tests/test_llm_scheduler.py
+
+import asyncio
+
+from llm_scheduler import LLMScheduler, TokenBucket, INTERACTIVE, BACKGROUND
+
+
+async def burst(scheduler, order, name, priority, hold=0.02):
+    async with scheduler.slot(priority):
+        order.append(name)
+        await asyncio.sleep(hold)
+
+
+def test_interactive_calls_go_ahead_of_queued_background_calls():
+    async def run():
+        scheduler = LLMScheduler(max_in_flight=2, reserved=1, requests_per_minute=0, tokens_per_minute=0)
+        order = []
+        background = [asyncio.create_task(burst(scheduler, order, f"bg{i}", BACKGROUND)) for i in range(4)]
+        await asyncio.sleep(0)
+        # Background may only use 1 of the 2 slots, so chat starts at once on the reserved one.
+        chat = asyncio.create_task(burst(scheduler, order, "chat0", INTERACTIVE))
+        await asyncio.sleep(0)
+        assert order == ["bg0", "chat0"]
+        late_chat = asyncio.create_task(burst(scheduler, order, "chat1", INTERACTIVE))
+        await asyncio.gather(*background, chat, late_chat)
+        return order, scheduler.stats()
+    order, stats = asyncio.run(run())
+    assert order.index("chat1") < order.index("bg2")  # queued chat skips the remaining background calls
+    assert stats["priorities"][BACKGROUND]["max_queue_depth"] == 3
+    assert all(p["in_flight"] == 0 and p["queue_depth"] == 0 for p in stats["priorities"].values())
+
+def test_rate_limit_delays_calls_in_priority_order():
+    async def run():
+        scheduler = LLMScheduler(max_in_flight=10, reserved=0, requests_per_minute=600, tokens_per_minute=0)  # one per 0.1 s
+        scheduler.requests.level = 0
+        order = []
+        await asyncio.gather(
+            burst(scheduler, order, "bg", BACKGROUND, hold=0),
+            burst(scheduler, order, "chat", INTERACTIVE, hold=0),
+        )
+        return order, scheduler.stats()
+    order, stats = asyncio.run(run())
+    assert order == ["chat", "bg"]
+    assert sum(p["rate_limited"] for p in stats["priorities"].values()) >= 1
+
+def test_cancelled_waiter_releases_nothing_it_did_not_hold():
+    async def run():
+        scheduler = LLMScheduler(max_in_flight=1, reserved=0, requests_per_minute=0)
+        holder = asyncio.create_task(burst(scheduler, [], "holder", INTERACTIVE, hold=0.05))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(burst(scheduler, [], "waiter", INTERACTIVE))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await holder
+        async with scheduler.slot(INTERACTIVE):
+            pass
+        return scheduler.stats()["priorities"][INTERACTIVE]
+    stats = asyncio.run(run())
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+
+def test_token_bucket_settles_estimates():
+    bucket = TokenBucket(6000)
+    bucket.take(1000)
+    bucket.give_back(1000 - 400)  # the call used 400 of the 1000 charged
+    assert 5400 <= bucket.level < 5610
@@ -0,0 +1,46 @@
+# backend/tests/test_pdf_writer.py
+
+import os
+import re
+
+import pytest
+
+import pdf_writer
+from country_data import countries
+from proposal_logic import prepare_proposal_data
+
+FONT_DIR = os.path.join(os.path.dirname(pdf_writer.__file__), "fonts")
+USER_DETAILS = {
+    "name": "Jane Doe", "company": "Acme Corp", "email": "jane@acme.com", "phone": "5550100", "country": "USA",
+    "company_size": "11-50", "budget": "$1,200 - $4,800", "main_service": "Web Development", "sub_category": "_default",
+    "category": "E-commerce Website", "description": "Payment gateway and inventory sync — ünïcödé.",
+}
+PROPOSAL_TEXT = {"introduction": "We are delighted to present this proposal. " * 6}
+CATEGORY_DATA = {"ui_ux_cost_inr": 50000, "frontend_cost_inr": 90000, "backend_cost_inr": 120000, "qa_cost_inr": 30000, "pm_cost_inr": 25000}
+
+def parse_fonts(pdf_instance):
+    for style, file_name in (("", "DejaVuSans.ttf"), ("B", "DejaVuSans-Bold.ttf"), ("I", "DejaVuSans-Oblique.ttf")):
+        pdf_instance.add_font("DejaVu", style, os.path.join(FONT_DIR, file_name))
+
+def render():
+    country_info = countries["USA"]
+    costs = prepare_proposal_data(CATEGORY_DATA, country_info, USER_DETAILS["company_size"])
+    pdf = pdf_writer.create_proposal_pdf(USER_DETAILS, PROPOSAL_TEXT, costs, country_info)
+    # Only the timestamps (and the file id derived from them) may differ between renders.
+    return re.sub(rb"/CreationDate \(D:[^)]*\)|/ID \[<[0-9A-F]+><[0-9A-F]+>\]", b"", pdf)
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(FONT_DIR, "DejaVuSans.ttf")), reason="DejaVu fonts not present")
+def test_cached_fonts_render_the_same_bytes_as_parsing(monkeypatch):
+    cached = [render(), render()]
+    monkeypatch.setattr(pdf_writer, "setup_fonts", parse_fonts)
+    assert cached == [render(), render()]
+
+@pytest.mark.skipif(not os.path.exists(os.path.join(FONT_DIR, "DejaVuSans.ttf")), reason="DejaVu fonts not present")
+def test_documents_do_not_share_mutable_font_state():
+    first, second = pdf_writer.PDF(), pdf_writer.PDF()
+    pdf_writer.setup_fonts(first)
+    pdf_writer.setup_fonts(second)
+    a, b = first.fonts["dejavu"], second.fonts["dejavu"]
+    for name in pdf_writer.PER_DOCUMENT_FONT_FIELDS - {"i", "_hbfont", "biggest_size_pt"}:
+        assert getattr(a, name) is not getattr(b, name), name
+    assert a.cmap is b.cmap  # the parsed tables are shared
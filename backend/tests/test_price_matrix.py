@@ -0,0 +1,45 @@
+# backend/tests/test_price_matrix.py
+
+import pytest
+
+from conversation import COMPANY_SIZE_DROPDOWN
+from country_data import countries
+from price_matrix import PriceMatrix
+from proposal_logic import prepare_proposal_data
+
+COMPANY_SIZES = COMPANY_SIZE_DROPDOWN["options"] + ["", "unknown"]
+
+
+@pytest.fixture(scope="module")
+def matrix(catalog):
+    return PriceMatrix(catalog, countries)
+
+def catalog_rows(catalog):
+    return [
+        (main_service, sub_category, category, row)
+        for main_service, sub_categories in catalog.services_data.items()
+        for sub_category, categories in sub_categories.items()
+        for category, row in categories.items()
+    ]
+
+
+def test_quotes_match_prepare_proposal_data(catalog, matrix):
+    rows = catalog_rows(catalog)
+    assert rows
+    for main_service, sub_category, category, row in rows[::7]:
+        for country, country_info in countries.items():
+            for company_size in COMPANY_SIZES:
+                expected = prepare_proposal_data(row, country_info, company_size)
+                assert matrix.quote(main_service, sub_category, category, country, company_size) == expected
+
+def test_quote_batch_matches_single_quotes(catalog, matrix):
+    main_service = next(iter(catalog.services_data))
+    rows = matrix.rows_matching(main_service)
+    some_countries = list(countries)[:3]
+    for row, country, company_size, quote in matrix.quote_batch(rows, some_countries, COMPANY_SIZES):
+        assert quote == matrix.quote(*row, country, company_size)
+
+def test_unknown_row_or_country_is_not_quoted(catalog, matrix):
+    main_service, sub_category, category, _ = catalog_rows(catalog)[0]
+    assert matrix.quote(main_service, sub_category, "No Such Row", next(iter(countries)), "1-10") is None
+    assert matrix.quote(main_service, sub_category, category, "Atlantis", "1-10") is None
@@ -0,0 +1,97 @@
+# backend/tests/test_proposal_cache.py
+
+import os
+import json
+import asyncio
+
+import pytest
+
+import proposal_cache
+from proposal_cache import ProposalTextCache, get_proposal_text, proposal_text_key
+
+CATALOG_ROW = {"category": "Food Delivery", "project_overview": "Order food online.", "core_modules": "Menu, Cart"}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ProposalTextCache(str(tmp_path / "proposal_text_cache.json"))
+    monkeypatch.setattr(proposal_cache, "proposal_text_cache", cache)
+    calls = []
+    async def fake_generate(category_data, category_name=None):
+        calls.append(category_name or category_data["category"])
+        return {"introduction": f"About {category_name or category_data['category']}", "scope_of_work": "..."}
+    monkeypatch.setattr(proposal_cache, "generate_descriptive_text", fake_generate)
+    cache.calls = calls
+    return cache
+
+
+def test_catalog_row_text_is_cached(cache):
+    first = asyncio.run(get_proposal_text(CATALOG_ROW, "Food Delivery"))
+    again = asyncio.run(get_proposal_text(CATALOG_ROW, "Food Delivery"))
+    assert first == again and cache.calls == ["Food Delivery"]
+    assert proposal_text_key(CATALOG_ROW) in cache
+
+def test_estimated_custom_row_never_reaches_the_cache(cache):
+    # custom_estimator rows use the custom name as their category, so the name check alone can't tell.
+    row = {"category": "Online booking portal", "project_overview": "", "core_modules": "", "estimate_source": "neighbours"}
+    asyncio.run(get_proposal_text(row, "Online booking portal"))
+    asyncio.run(get_proposal_text(row, "Online booking portal"))
+    assert cache.calls == ["Online booking portal", "Online booking portal"]
+    assert len(cache) == 0
+    assert not os.path.exists(cache.path)
+
+def test_renamed_custom_request_skips_the_cache(cache):
+    asyncio.run(get_proposal_text(CATALOG_ROW, "My own thing"))
+    assert len(cache) == 0
+
+def test_set_only_writes_on_save(tmp_path):
+    cache = ProposalTextCache(str(tmp_path / "cache.json"))
+    cache.set("a", {"introduction": "A"})
+    assert not os.path.exists(cache.path)
+    asyncio.run(cache.save())
+    assert json.load(open(cache.path, encoding="utf-8")) == {"a": {"introduction": "A"}}
+
+def test_processes_merge_instead_of_overwriting_each_other(tmp_path):
+    path = str(tmp_path / "cache.json")
+    first, second = ProposalTextCache(path), ProposalTextCache(path)  # e.g. two proposal workers
+    first.load(); second.load()
+    first.set("a", {"introduction": "A"})
+    first.persist()
+    second.set("b", {"introduction": "B"})
+    second.persist()
+    assert set(json.load(open(path, encoding="utf-8"))) == {"a", "b"}
+    assert "a" in second
+
+def test_catalog_reload_replaces_the_running_warmup(monkeypatch):
+    import main
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.delenv("PROPOSAL_WARMUP", raising=False)
+    monkeypatch.setattr(main.app.state, "proposal_warmup_task", None, raising=False)
+    running, finished = [], []
+
+    async def fake_warmup(services_data):
+        running.append(services_data["version"])
+        assert len(running) == 1, "two warm-ups ran at once"
+        try:
+            await asyncio.sleep(0.05)
+            finished.append(services_data["version"])
+        finally:
+            running.remove(services_data["version"])
+    monkeypatch.setattr(main, "warm_proposal_cache", fake_warmup)
+
+    class Catalog:
+        def __init__(self, version):
+            self.version = version
+            self.services_data = {"version": version}
+
+    async def run():
+        main.start_proposal_warmup(Catalog("v1"))
+        await asyncio.sleep(0.01)
+        first = main.app.state.proposal_warmup_task
+        main.start_proposal_warmup(Catalog("v1"))  # same version still warming: left alone
+        assert main.app.state.proposal_warmup_task is first
+        main.start_proposal_warmup(Catalog("v2"))
+        await main.app.state.proposal_warmup_task
+        return first
+    first = asyncio.run(run())
+    assert first.cancelled() and finished == ["v2"]
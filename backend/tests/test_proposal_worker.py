@@ -0,0 +1,18 @@
+# backend/tests/test_proposal_worker.py
+
+import asyncio
+
+import job_queue
+from job_queue import JobQueue
+from proposal_worker import process_job
+
+
+def test_malformed_job_goes_through_fail(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_RETRY_BASE_SECONDS", 0)
+    queue = JobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.enqueue("proposal", {"no_user_details": True})
+    for _ in range(job_queue.JOB_MAX_ATTEMPTS):
+        asyncio.run(process_job(queue, None, queue.claim()))
+    job = queue.get(job_id)
+    assert job["status"] == "failed"
+    assert "user_details" in job["error"]
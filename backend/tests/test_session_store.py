@@ -0,0 +1,38 @@
+# backend/tests/test_session_store.py
+
+import pytest
+
+from session_store import SessionBackend, MemorySessionBackend, SessionStore, diff_details
+
+
+class NoDeleteBackend(SessionBackend):
+    def get(self, session_id):
+        return None
+
+    def set(self, session_id, state):
+        pass
+
+
+def test_diff_details_reports_changed_added_and_removed_keys():
+    before = {"name": "A", "stage": "ask_email", "history": ["a"], "budget": "10k"}
+    after = {"name": "A", "stage": "ask_phone", "history": ["a", "b"], "email": "a@x.com"}
+    changed, removed = diff_details(before, after)
+    assert changed == {"stage": "ask_phone", "history": ["a", "b"], "email": "a@x.com"}
+    assert removed == ["budget"]
+
+def test_diff_details_of_identical_dicts_is_empty():
+    details = {"name": "A", "history": []}
+    assert diff_details(details, dict(details)) == ({}, [])
+
+def test_incomplete_backend_fails_when_created():
+    with pytest.raises(TypeError, match="delete"):
+        NoDeleteBackend()
+
+def test_memory_backend_round_trip():
+    store = SessionStore(MemorySessionBackend(max_size=10, ttl=60))
+    session_id = store.create()
+    assert store.load(session_id) == {"stage": "get_name", "user_details": {"stage_history": []}}
+    store.save(session_id, "initial_choice", {"stage_history": [], "name": "A"})
+    assert store.load(session_id)["stage"] == "initial_choice"
+    store.backend.delete(session_id)
+    assert store.load(session_id) is None